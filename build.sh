@@ -5,4 +5,7 @@ set -o errexit
 pip install -r requirements.txt
 
 # Run database migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# Create the database cache table for generation results
+python manage.py createcachetable
\ No newline at end of file
@@ -8,7 +8,10 @@ from.models import (
     Lesson,
     ConstraintType,
     ConstraintInstance,
-    ConstraintParameter
+    ConstraintParameter,
+    GenerationJob,
+    GeneratedTimetable,
+    AlgorithmSettings,
 )
 
 # Register your models here to make them accessible in the Django admin panel.
@@ -19,4 +22,7 @@ admin.site.register(TimeSlot)
 admin.site.register(Lesson)
 admin.site.register(ConstraintType)
 admin.site.register(ConstraintInstance)
-admin.site.register(ConstraintParameter)
\ No newline at end of file
+admin.site.register(ConstraintParameter)
+admin.site.register(GenerationJob)
+admin.site.register(GeneratedTimetable)
+admin.site.register(AlgorithmSettings)
@@ -0,0 +1,263 @@
+# core/benchmarks.py
+"""
+Synthetic school data and benchmarks for measuring the generator without
+a database.
+
+run_benchmarks() runs TimetableGenerator end to end on seeded synthetic
+schools (BENCH_SCENARIOS) and times its operators in isolation. The report
+is a JSON-serialisable dict; compare_reports() lists the metrics that got
+worse between two reports. Like timeit, every timing is taken `repeat`
+times and the fastest is reported, so one noisy run does not read as a
+regression. See `manage.py bench_generator`.
+"""
+import dataclasses
+import platform
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from .generator import TimetableGenerator, SearchBudget
+from .slots import DEFAULT_DAYS, DEFAULT_PERIODS_IN_DAY
+
+TEACHER_MAX_PERIODS = 30
+# Synthetic schools have no TimeSlot rows, so the generator uses the default grid
+SYNTHETIC_DAYS = len(DEFAULT_DAYS)
+SYNTHETIC_PERIODS = DEFAULT_PERIODS_IN_DAY
+SYNTHETIC_SOFT_WEIGHT = 10
+
+# Named school sizes, as synthetic_school_data() arguments
+BENCH_SCENARIOS = {
+    'small': {'groups': 10},
+    'medium': {'groups': 40},
+    'large': {'groups': 80},
+    'constrained': {'groups': 40, 'constraint_density': 0.1},
+}
+BENCH_GENERATIONS = 50
+OPERATOR_REPEATS = 200
+# Times each timing is taken; the fastest counts
+BENCH_REPEAT = 3
+# Metrics compared between reports, and whether higher is better
+BENCH_METRICS = {
+    'wall_seconds': False,
+    'evaluations_per_second': True,
+    'peak_memory_bytes': False,
+    'per_call_us': False,
+}
+
+
+def synthetic_school_data(groups=40, subjects=8, periods_per_week=40, teachers=None, constraint_density=0.0, seed=0):
+    """
+    Builds a school_data dict in the shape GenerateTimetableView passes to
+    TimetableGenerator. Every group gets `periods_per_week` periods spread
+    over `subjects` lessons, and lessons are dealt to teachers so that no
+    teacher is booked above TEACHER_MAX_PERIODS. `constraint_density` is the
+    share of each teacher's slots marked unavailable, alternately HARD and
+    SOFT.
+    """
+    rnd = random.Random(seed)
+    total_periods = groups * periods_per_week
+    if teachers is None:
+        teachers = -(-total_periods // (TEACHER_MAX_PERIODS - 4))
+    teacher_rows = [
+        {"id": i, "name": f"Teacher {i}", "designation": "TGT", "max_periods_per_week": TEACHER_MAX_PERIODS}
+        for i in range(1, teachers + 1)
+    ]
+    subject_rows = [
+        {"id": i, "subject_name": f"Subject {i}", "subject_code": f"S{i}"}
+        for i in range(1, subjects + 1)
+    ]
+    group_rows = [
+        {"id": i, "group_name": f"Group {i}", "grade_level": str(6 + i % 7)}
+        for i in range(1, groups + 1)
+    ]
+
+    load = {t["id"]: 0 for t in teacher_rows}
+    lesson_rows = []
+    for group in group_rows:
+        base, extra = divmod(periods_per_week, subjects)
+        for index, subject in enumerate(subject_rows):
+            periods = base + (1 if index < extra else 0)
+            if not periods:
+                continue
+            candidates = [t for t, booked in load.items() if booked + periods <= TEACHER_MAX_PERIODS]
+            teacher_id = rnd.choice(candidates or list(load))
+            load[teacher_id] += periods
+            lesson_rows.append({
+                "id": len(lesson_rows) + 1,
+                "subject_id": subject["id"],
+                "student_group_id": group["id"],
+                "periods_per_week": periods,
+                "teacher_ids": [teacher_id],
+            })
+
+    constraint_rows = []
+    n_slots = SYNTHETIC_DAYS * SYNTHETIC_PERIODS
+    for teacher in teacher_rows:
+        for n, cell in enumerate(rnd.sample(range(n_slots), int(round(constraint_density * n_slots)))):
+            day, period = divmod(cell, SYNTHETIC_PERIODS)
+            constraint_rows.append({
+                "id": len(constraint_rows) + 1,
+                "type_name": "TEACHER_UNAVAILABLE",
+                "constraint_level": "HARD" if n % 2 == 0 else "SOFT",
+                "weight": SYNTHETIC_SOFT_WEIGHT,
+                "parameters": {"teacher_id": str(teacher["id"]), "day": str(day), "period": str(period + 1)},
+            })
+
+    return {
+        "teachers": teacher_rows,
+        "subjects": subject_rows,
+        "student_groups": group_rows,
+        "timeslots": [],
+        "lessons": lesson_rows,
+        "constraints": constraint_rows,
+    }
+
+
+# --- Benchmarks ---
+def bench_end_to_end(school_data, budget, seed=0, memory=True, repeat=1):
+    """
+    Wall time, evaluations/sec, final violations and phase timings of the
+    fastest of `repeat` identical runs; peak memory from one more, traced run.
+    """
+    walls = []
+    for _ in range(repeat):
+        generator = TimetableGenerator(school_data, seed=seed)
+        started = time.perf_counter()
+        result = generator.run_generation(budget=budget)
+        walls.append(time.perf_counter() - started)
+        if walls[-1] == min(walls):
+            fastest = generator, result
+    generator, result = fastest
+    wall = min(walls)
+    stats = result.get('stats', {})
+    report = {
+        "wall_seconds": round(wall, 4),
+        "wall_seconds_runs": [round(seconds, 4) for seconds in walls],
+        "generations": stats.get('generations'),
+        "evaluations": stats.get('evaluations'),
+        "evaluations_per_second": round(stats.get('evaluations', 0) / wall, 1),
+        "best_fitness": stats.get('best_fitness'),
+        "hard_violations": stats.get('hard_violations'),
+        "soft_penalty": stats.get('soft_penalty'),
+        "stop_reason": result.get('stop_reason'),
+        "phase_seconds": generator.telemetry.as_dict()['phase_seconds'],
+    }
+    if memory:
+        # tracemalloc slows allocation-heavy code, so the timed run above is not traced
+        tracemalloc.start()
+        try:
+            TimetableGenerator(school_data, seed=seed).run_generation(budget=budget)
+            report["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return report
+
+
+def _timed(function, repeats, repeat=1):
+    """ Calls `function` `repeats` times, `repeat` times over; reports the fastest round. """
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(repeats):
+            function()
+        rounds.append(time.perf_counter() - started)
+    seconds = min(rounds)
+    return {"calls": repeats, "seconds": round(seconds, 4), "per_call_us": round(seconds / repeats * 1e6, 1)}
+
+
+def bench_operators(school_data, repeats=OPERATOR_REPEATS, seed=0, repeat=1):
+    """ Per-call cost of each GA operator on a seeded initial population, fastest of `repeat` rounds. """
+    generator = TimetableGenerator(school_data, seed=seed)
+    population = generator.generate_initial_population()
+    slots = np.stack([genome.slots for genome in population])
+    teachers = np.stack([genome.teachers for genome in population])
+    scores = generator.fitness_engine.evaluate(slots, teachers)
+    for genome, score in zip(population, scores.tolist()):
+        genome.fitness = score
+    fitness_scores = sorted(zip(scores.tolist(), population), key=lambda x: x[0])
+    parents = generator.selection(fitness_scores)
+    fitness_repeats = max(1, repeats // 10)
+
+    report = {
+        "greedy_individual": _timed(generator.greedy_individual, max(1, repeats // 10), repeat),
+        "random_individual": _timed(generator.random_individual, repeats, repeat),
+        "fitness": _timed(lambda: generator.fitness_engine.evaluate(slots, teachers), fitness_repeats, repeat),
+        "selection": _timed(lambda: generator.selection(fitness_scores), repeats, repeat),
+        "crossover": _timed(lambda: generator.crossover(*generator.rng.sample(parents, 2)), repeats, repeat),
+        "mutation": _timed(lambda: generator.mutation(generator.rng.choice(parents)), repeats, repeat),
+        "breed": _timed(lambda: generator.breed(fitness_scores), max(1, repeats // 10), repeat),
+        "hill_climb": _timed(lambda: generator.hill_climb(fitness_scores[0][1], 50), max(1, repeats // 10), repeat),
+        "format": _timed(lambda: generator.format_timetable_for_frontend(fitness_scores[0][1]), max(1, repeats // 10), repeat),
+    }
+    # One fitness call scores the whole population
+    report["fitness"]["evaluations_per_second"] = round(
+        fitness_repeats * len(population) / report["fitness"]["seconds"], 1
+    ) if report["fitness"]["seconds"] else None
+    return report
+
+
+def run_benchmarks(scenarios, generations=BENCH_GENERATIONS, repeats=OPERATOR_REPEATS, seed=0, memory=True,
+                   overrides=None, repeat=BENCH_REPEAT):
+    """
+    Benchmarks each named scenario (see BENCH_SCENARIOS; `overrides` replaces
+    synthetic_school_data() arguments for all of them). Runs stop after
+    `generations` generations rather than at the first clash-free timetable,
+    so every run does the same amount of work. Timings are the fastest of
+    `repeat` measurements.
+    """
+    budget = SearchBudget(max_generations=generations, target_fitness=-1)
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "seed": seed,
+        "budget": dataclasses.asdict(budget),
+        "operator_repeats": repeats,
+        "repeat": repeat,
+        "scenarios": {},
+    }
+    for name in scenarios:
+        options = {**BENCH_SCENARIOS[name], **(overrides or {}), 'seed': seed}
+        school_data = synthetic_school_data(**options)
+        report["scenarios"][name] = {
+            "school": {
+                **options,
+                "teachers": len(school_data['teachers']),
+                "lessons": len(school_data['lessons']),
+                "lesson_periods": sum(lesson['periods_per_week'] for lesson in school_data['lessons']),
+                "constraints": len(school_data['constraints']),
+            },
+            "end_to_end": bench_end_to_end(school_data, budget, seed=seed, memory=memory, repeat=repeat),
+            "operators": bench_operators(school_data, repeats=repeats, seed=seed, repeat=repeat),
+        }
+    return report
+
+
+def compare_reports(baseline, current, tolerance=0.1):
+    """
+    Metrics (BENCH_METRICS) that are more than `tolerance` (a fraction) worse
+    in `current` than in `baseline`, as (scenario, metric path, old, new) tuples.
+    Scenarios or metrics missing from either report are skipped.
+    """
+    regressions = []
+
+    def walk(scenario, path, old, new):
+        for key, value in new.items():
+            if key not in old:
+                continue
+            if isinstance(value, dict) and isinstance(old[key], dict):
+                walk(scenario, f"{path}.{key}", old[key], value)
+            elif key in BENCH_METRICS and value is not None and old[key]:
+                change = (value - old[key]) / old[key]
+                if (-change if BENCH_METRICS[key] else change) > tolerance:
+                    regressions.append((scenario, f"{path}.{key}".lstrip('.'), old[key], value))
+
+    for scenario, results in current.get("scenarios", {}).items():
+        if scenario in baseline.get("scenarios", {}):
+            walk(scenario, '', baseline["scenarios"][scenario], results)
+    return regressions
@@ -0,0 +1,91 @@
+# core/cache.py
+"""
+Generation result cache.
+
+Results are keyed by a fingerprint of everything that determines them:
+the school data (teachers, subjects, groups, timeslots, lessons with their
+teachers, constraints with their parameters) plus the run parameters and
+generator options. Entries live in the 'generation_results' cache (see
+CACHES in settings) and are cleared by the model signals in core/signals.py
+whenever school data changes.
+"""
+import hashlib
+import json
+import threading
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import caches
+
+RESULT_CACHE_ALIAS = 'generation_results'
+KEY_PREFIX = 'generation-result:'
+VERSION_KEY = 'school-data-version'
+
+_deferred = threading.local()
+
+
+def result_cache():
+    return caches[RESULT_CACHE_ALIAS]
+
+
+def fingerprint(school_data, parameters, options):
+    """ Stable SHA-256 of the school data, run parameters and generator options. """
+    canonical = {
+        table: sorted(
+            ({**row, 'teacher_ids': sorted(row['teacher_ids'])} if 'teacher_ids' in row else row for row in rows),
+            key=lambda row: row['id'],
+        )
+        for table, rows in school_data.items()
+    }
+    payload = json.dumps(
+        {'school_data': canonical, 'parameters': parameters, 'options': options},
+        sort_keys=True, default=str, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_result(key):
+    cache = result_cache()
+    result = cache.get(KEY_PREFIX + key)
+    if result is not None:
+        # Sliding expiry: entries in use do not expire (culling a full cache ignores this)
+        cache.touch(KEY_PREFIX + key)
+    return result
+
+
+def store_result(key, result):
+    result_cache().set(KEY_PREFIX + key, result)
+
+
+def school_data_version():
+    """
+    Token that changes whenever clear_results() runs. Per-process caches of
+    things derived from school data (see core.validation) key on it so an
+    edit made through any process invalidates them everywhere.
+    """
+    cache = result_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def clear_results(**kwargs):
+    """ Signal receiver: any change to school data makes every cached result stale. """
+    if getattr(_deferred, 'active', False):
+        _deferred.pending = True
+        return
+    result_cache().clear()
+
+
+@contextmanager
+def clearing_deferred():
+    """ Runs a block of many writes (e.g. a bulk delete) with one cache clear at the end instead of one per row. """
+    _deferred.active, _deferred.pending = True, False
+    try:
+        yield
+    finally:
+        _deferred.active = False
+        if _deferred.pending:
+            clear_results()
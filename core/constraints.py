@@ -0,0 +1,171 @@
+# core/constraints.py
+"""
+Compiles ConstraintInstance / ConstraintParameter rows into penalty arrays.
+
+Constraints are interpreted once, when the generator is created. The
+fitness engine then applies all of them to a whole population with a few
+array gathers instead of looking at parameter strings per individual.
+
+Supported constraint types and their parameters:
+
+    TEACHER_UNAVAILABLE             teacher_id + slot
+    GROUP_UNAVAILABLE               student_group_id + slot
+    SUBJECT_UNAVAILABLE             subject_id + slot
+    TEACHER_MAX_PERIODS_PER_DAY     teacher_id, max_periods
+    TEACHER_MAX_CONSECUTIVE_PERIODS teacher_id, max_periods (back-to-back periods of one day)
+
+A slot is given either as `timeslot_id` (a TimeSlot row) or as `day`
+(0 = Monday as in TimeSlot.day_of_week, or the day name) plus `period`
+(1-based: the n-th TimeSlot of that day). HARD constraints
+count as hard violations; SOFT ones add their `weight` to the soft penalty.
+"""
+import logging
+
+import numpy as np
+
+from .slots import DAY_NAMES
+
+HARD = 'HARD'
+SOFT = 'SOFT'
+
+logger = logging.getLogger(__name__)
+
+
+class ConstraintError(ValueError):
+    """ A constraint row that cannot be compiled (unknown type, bad parameters). """
+
+
+class CompiledConstraints:
+    """
+    Penalty tables for one level (HARD or SOFT):
+
+    - teacher_slot[t, s]: penalty when teacher t teaches in slot s
+    - requirement_slot[i, s]: penalty when requirement i is placed in slot s
+      (group and subject constraints, expanded to the requirements they hit)
+    - daily_limit[t] / daily_weight[t]: penalty per period teacher t teaches
+      above daily_limit[t] on one day
+    - consecutive_limit[t] / consecutive_weight[t]: penalty per period teacher
+      t teaches beyond consecutive_limit[t] back-to-back periods
+    """
+    def __init__(self, n_teachers, n_requirements, n_slots):
+        self.teacher_slot = np.zeros((n_teachers, n_slots), dtype=np.int64)
+        self.requirement_slot = np.zeros((n_requirements, n_slots), dtype=np.int64)
+        self.daily_limit = np.full(n_teachers, n_slots, dtype=np.int64)
+        self.daily_weight = np.zeros(n_teachers, dtype=np.int64)
+        self.consecutive_limit = np.full(n_teachers, n_slots, dtype=np.int64)
+        self.consecutive_weight = np.zeros(n_teachers, dtype=np.int64)
+
+    @property
+    def is_empty(self):
+        return not (
+            self.teacher_slot.any() or self.requirement_slot.any() or self.daily_weight.any()
+            or self.consecutive_weight.any()
+        )
+
+
+class ConstraintCompiler:
+    """ Turns constraint rows into a HARD and a SOFT CompiledConstraints for one generator. """
+    def __init__(self, generator):
+        self.generator = generator
+        shape = (len(generator.teacher_ids), len(generator.lesson_requirements), generator.n_slots)
+        self.compiled = {HARD: CompiledConstraints(*shape), SOFT: CompiledConstraints(*shape)}
+        self.warnings = []
+        self.handlers = {
+            'TEACHER_UNAVAILABLE': self.teacher_unavailable,
+            'GROUP_UNAVAILABLE': self.group_unavailable,
+            'SUBJECT_UNAVAILABLE': self.subject_unavailable,
+            'TEACHER_MAX_PERIODS_PER_DAY': self.teacher_max_periods_per_day,
+            'TEACHER_MAX_CONSECUTIVE_PERIODS': self.teacher_max_consecutive_periods,
+        }
+
+    def compile(self, constraints):
+        """ Returns (hard, soft) tables; rows that cannot be compiled are skipped with a warning. """
+        for constraint in constraints:
+            try:
+                handler = self.handlers.get(constraint['type_name'])
+                if handler is None:
+                    raise ConstraintError(f"unknown constraint type {constraint['type_name']!r}")
+                level = constraint['constraint_level']
+                if level not in self.compiled:
+                    raise ConstraintError(f"unknown constraint level {level!r}")
+                penalty = 1 if level == HARD else constraint.get('weight') or 0
+                if penalty <= 0:
+                    continue  # A soft constraint without weight has no effect
+                handler(self.compiled[level], constraint['parameters'], penalty)
+            except (ConstraintError, KeyError, ValueError) as e:
+                self.warnings.append(f"Constraint {constraint.get('id')} ignored: {e}")
+        for warning in self.warnings:
+            logger.warning(warning)
+        return self.compiled[HARD], self.compiled[SOFT]
+
+    # --- Parameter lookups ---
+    def _index(self, parameters, key, index):
+        return index[self._known(parameters, key, index)]
+
+    def _required(self, parameters, key):
+        if key not in parameters:
+            raise ConstraintError(f"missing parameter {key!r}")
+        return parameters[key]
+
+    def _slot(self, parameters):
+        generator = self.generator
+        if 'timeslot_id' in parameters:
+            slot = generator.timeslot_row_slots.get(int(parameters['timeslot_id']))
+            if slot is None:
+                raise ConstraintError(f"timeslot_id={parameters['timeslot_id']!r} is not on the slot grid")
+            return slot
+        day = self._required(parameters, 'day')
+        if day not in DAY_NAMES:
+            day = DAY_NAMES[int(day)] if 0 <= int(day) < len(DAY_NAMES) else None
+        period = int(self._required(parameters, 'period')) - 1
+        slot = generator.grid.slot(generator.days.index(day), period) if day in generator.days else None
+        if slot is None:
+            raise ConstraintError(f"day={parameters['day']}, period={period + 1} is not on the slot grid")
+        return slot
+
+    def _requirements(self, key, value):
+        return [i for i, req in enumerate(self.generator.lesson_requirements) if req[key] == value]
+
+    def _known(self, parameters, key, rows):
+        value = self._required(parameters, key)
+        try:
+            value = int(value)
+        except ValueError:
+            raise ConstraintError(f"{key}={value!r} is not an id")
+        if value not in rows:
+            raise ConstraintError(f"{key}={value!r} does not match any row")
+        return value
+
+    # --- Handlers ---
+    def teacher_unavailable(self, compiled, parameters, penalty):
+        teacher = self._index(parameters, 'teacher_id', self.generator.teacher_index)
+        compiled.teacher_slot[teacher, self._slot(parameters)] += penalty
+
+    def group_unavailable(self, compiled, parameters, penalty):
+        group_id = self._known(parameters, 'student_group_id', self.generator.group_index)
+        compiled.requirement_slot[self._requirements('group_id', group_id), self._slot(parameters)] += penalty
+
+    def subject_unavailable(self, compiled, parameters, penalty):
+        subject_id = self._known(parameters, 'subject_id', self.generator.subjects)
+        compiled.requirement_slot[self._requirements('subject_id', subject_id), self._slot(parameters)] += penalty
+
+    def teacher_max_periods_per_day(self, compiled, parameters, penalty):
+        teacher = self._index(parameters, 'teacher_id', self.generator.teacher_index)
+        limit = int(self._required(parameters, 'max_periods'))
+        compiled.daily_limit[teacher] = min(compiled.daily_limit[teacher], limit)
+        compiled.daily_weight[teacher] = max(compiled.daily_weight[teacher], penalty)
+
+    def teacher_max_consecutive_periods(self, compiled, parameters, penalty):
+        teacher = self._index(parameters, 'teacher_id', self.generator.teacher_index)
+        limit = int(self._required(parameters, 'max_periods'))
+        if limit < 1:
+            raise ConstraintError(f"max_periods={limit} must be at least 1")
+        compiled.consecutive_limit[teacher] = min(compiled.consecutive_limit[teacher], limit)
+        compiled.consecutive_weight[teacher] = max(compiled.consecutive_weight[teacher], penalty)
+
+
+def compile_constraints(generator, constraints):
+    """ Returns (hard, soft, warnings) for the constraint rows of `school_data`. """
+    compiler = ConstraintCompiler(generator)
+    hard, soft = compiler.compile(constraints)
+    return hard, soft, compiler.warnings
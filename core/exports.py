@@ -0,0 +1,84 @@
+# core/exports.py
+"""
+Whole-school Excel export of a stored timetable.
+
+The workbook is built in openpyxl's write-only mode, which writes each row
+to a temporary file as it is appended, and is saved to a temporary file
+that the response streams in chunks. Memory use does not grow with the
+number of groups or teachers.
+"""
+import re
+import tempfile
+from collections import defaultdict
+
+import openpyxl
+
+from .timetables import timetable_grid
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+# Excel sheet titles: at most 31 characters, none of []:*?/\
+SHEET_TITLE_LENGTH = 31
+INVALID_TITLE_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+
+def sheet_title(name, used):
+    """ A valid sheet title for `name` that is not in `used` (which it is added to). """
+    base = INVALID_TITLE_CHARS.sub('', str(name)).strip()[:SHEET_TITLE_LENGTH] or 'Sheet'
+    title, n = base, 1
+    while title.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        title = base[:SHEET_TITLE_LENGTH - len(suffix)] + suffix
+    used.add(title.lower())
+    return title
+
+
+def write_grid(workbook, title, grid, cells):
+    """ Appends a sheet with one row per period and one column per day of `grid`; `cells` maps slot -> text. """
+    ws = workbook.create_sheet(title)
+    ws.append(['Time'] + grid.days)
+    for period, label in enumerate(grid.period_labels()):
+        ws.append([label] + [cells.get(grid.slot(day, period), "") for day in range(len(grid.days))])
+
+
+def write_school_workbook(timetable, file):
+    """ Writes one sheet per student group, then one per teacher, into `file`. """
+    # Keyed on (id, name): the ids of deleted groups and teachers are None
+    groups, teachers = defaultdict(dict), defaultdict(dict)
+    for lesson in timetable['lessons']:
+        slot = lesson['slot']
+        group = (lesson['student_group_id'], lesson['group_name'])
+        teacher = (lesson['teacher_id'], lesson['teacher_name'])
+        groups[group].setdefault(slot, f"{lesson['subject_name']}\n{lesson['teacher_name']}")
+        teachers[teacher].setdefault(slot, f"{lesson['subject_name']}\n{lesson['group_name']}")
+
+    grid = timetable_grid(timetable)
+    workbook = openpyxl.Workbook(write_only=True)
+    used = set()
+    for group in sorted(groups, key=lambda g: g[1]):
+        write_grid(workbook, sheet_title(group[1], used), grid, groups[group])
+    for teacher in sorted(teachers, key=lambda t: t[1]):
+        write_grid(workbook, sheet_title(f"T - {teacher[1]}", used), grid, teachers[teacher])
+    if not used:
+        workbook.create_sheet('Timetable')  # A workbook needs at least one sheet
+    workbook.save(file)
+
+
+def stream_school_workbook(timetable):
+    """ Builds the workbook in a temporary file and returns an iterator over its bytes. """
+    file = tempfile.TemporaryFile()
+    try:
+        write_school_workbook(timetable, file)
+        file.seek(0)
+    except Exception:
+        file.close()
+        raise
+
+    def chunks():
+        with file:
+            while True:
+                chunk = file.read(EXPORT_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+    return chunks()
@@ -1,150 +1,1323 @@
 # D:\timetable_generator\timetable_project\core\generator.py
+import logging
+import math
+import multiprocessing
+import queue
 import random
+import time
+import traceback
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
 
-# --- (Configuration constants are the same) ---
+import numpy as np
+
+from .constraints import compile_constraints
+from .slots import SlotGrid
+from .telemetry import GenerationTelemetry
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
 POPULATION_SIZE = 150
 MAX_GENERATIONS = 250
 MUTATION_RATE = 0.15
 ELITISM_COUNT = 5
+TOURNAMENT_SIZE = 10
+GENOME_DTYPE = np.int16
+# One hard violation (clash, overload, HARD constraint) outweighs this much soft penalty
+HARD_CONSTRAINT_WEIGHT = 1000
+# Share of the initial population filled uniformly at random; the rest is greedy-seeded
+RANDOM_INITIAL_SHARE = 0.2
+# Hill-climbing moves tried on each elite every generation (0 = plain GA)
+LOCAL_SEARCH_STEPS = 0
+# Post-GA simulated annealing over the elites, in seconds (0 = off)
+REFINEMENT_SECONDS = 0
+REFINEMENT_REFRESH_MOVES = 500  # Moves between two conflict-list and temperature updates
+# Share of a max_seconds budget the initial population may use; past it the rest is filled at random
+SEEDING_TIME_SHARE = 0.25
+# Warm start: share of the population made of the previous timetable and mutated copies of it
+WARM_START_SHARE = 0.5
+# Island model: generations between two ring migrations
+ISLAND_MIGRATION_INTERVAL = 10
+# Seeds drawn when none is given; 32 bits stay exact as JSON (JavaScript) numbers
+SEED_BITS = 32
+# Timetable views in a result; clients can ask for a subset
+FRONTEND_VIEWS = ('schedules', 'teacher_schedules', 'slot_matrix')
+
+
+# --- Search budget ---
+STOP_TARGET_REACHED = 'target_reached'
+STOP_MAX_GENERATIONS = 'max_generations'
+STOP_TIME_LIMIT = 'time_limit'
+STOP_STAGNATION = 'stagnation'
+STOP_STOPPED = 'stopped'  # Island runs: another island reached the target
+
+
+@dataclass
+class SearchBudget:
+    """
+    When a run stops. Any limit left as None is not applied; the run stops
+    at the first limit hit and still returns the best genome found so far.
+    """
+    max_seconds: float = None
+    max_generations: int = MAX_GENERATIONS
+    stagnation_generations: int = None  # Stop after this many generations without improvement
+    target_fitness: int = 0  # Good enough, e.g. a tolerated soft-constraint penalty
+
+    def out_of_time(self, elapsed):
+        return self.max_seconds is not None and elapsed >= self.max_seconds
+
+    def deadline(self, started, share=1.0):
+        """ When `share` of max_seconds from `started` (a time.monotonic() value) is spent; None without a time limit. """
+        return None if self.max_seconds is None else started + self.max_seconds * share
+
+    def remaining(self, elapsed, seconds):
+        """ `seconds` capped at what is left of max_seconds after `elapsed`. """
+        return seconds if self.max_seconds is None else max(0.0, min(seconds, self.max_seconds - elapsed))
+
+    def stop_reason(self, generation, elapsed, best_fitness, generations_without_improvement):
+        if best_fitness <= self.target_fitness:
+            return STOP_TARGET_REACHED
+        if self.out_of_time(elapsed):
+            return STOP_TIME_LIMIT
+        if self.max_generations is not None and generation >= self.max_generations:
+            return STOP_MAX_GENERATIONS
+        if self.stagnation_generations is not None and generations_without_improvement >= self.stagnation_generations:
+            return STOP_STAGNATION
+        return None
+
+
+# Named budgets callers can ask for instead of spelling out the limits
+BUDGET_PROFILES = {
+    'interactive': SearchBudget(max_seconds=10, max_generations=None, stagnation_generations=50),
+    'overnight': SearchBudget(max_seconds=300, max_generations=None, stagnation_generations=2000),
+}
+
+
+# --- GA parameters ---
+@dataclass
+class GAParameters:
+    """ Population size and operator settings of a run; the module constants are the defaults. """
+    population_size: int = POPULATION_SIZE
+    mutation_rate: float = MUTATION_RATE
+    elitism_count: int = ELITISM_COUNT
+    tournament_size: int = TOURNAMENT_SIZE
+
+
+# Parameter profiles: 'default' uses the constants above, 'auto' scales with the school (see auto_parameters)
+PARAMETER_PROFILES = ('default', 'auto')
+# 'auto': population ~ AUTO_POPULATION_FACTOR * sqrt(requirements), generations ~ requirements / 4
+AUTO_POPULATION_FACTOR = 4
+AUTO_POPULATION_RANGE = (30, 300)
+AUTO_GENERATIONS_PER_REQUIREMENT = 0.25
+AUTO_GENERATIONS_RANGE = (20, 1000)
+
+
+def _clamp(value, bounds):
+    return max(bounds[0], min(bounds[1], int(round(value))))
+
+
+def auto_parameters(n_requirements):
+    """
+    GAParameters and a generation limit scaled to `n_requirements` lesson
+    periods: small schools get a small population and few generations and
+    finish in milliseconds, large ones get more search effort.
+    """
+    population_size = _clamp(AUTO_POPULATION_FACTOR * math.sqrt(n_requirements), AUTO_POPULATION_RANGE)
+    parameters = GAParameters(
+        population_size=population_size,
+        elitism_count=max(2, population_size // 30),
+        tournament_size=max(2, min(TOURNAMENT_SIZE, population_size // 10)),
+    )
+    return parameters, _clamp(n_requirements * AUTO_GENERATIONS_PER_REQUIREMENT, AUTO_GENERATIONS_RANGE)
+
+
+class FitnessEngine:
+    """
+    Scores a whole population in one batched NumPy pass.
+
+    Individuals are encoded as two integer matrices of shape
+    (population, lessons): the timeslot index and the teacher index of every
+    lesson requirement. Clashes are counted with bincount over the
+    teacher x slot and group x slot occupancy cells of every individual.
+    Compiled HARD and SOFT constraints (see core.constraints) are applied
+    as gathers from their penalty tables. `prev_slots` (SlotGrid.prev_slot)
+    links back-to-back periods for consecutive-period limits.
+    """
+    def __init__(self, n_slots, lesson_groups, teacher_capacity, slot_days=None, hard=None, soft=None,
+                 prev_slots=None):
+        self.n_slots = n_slots
+        self.lesson_groups = np.asarray(lesson_groups, dtype=np.int64)
+        self.teacher_capacity = np.asarray(teacher_capacity, dtype=np.int64)
+        self.n_teachers = len(self.teacher_capacity)
+        self.n_groups = int(self.lesson_groups.max()) + 1 if self.lesson_groups.size else 0
+        self.slot_days = np.zeros(n_slots, dtype=np.int64) if slot_days is None else np.asarray(slot_days, dtype=np.int64)
+        self.n_days = int(self.slot_days.max()) + 1 if n_slots else 0
+        self.prev_slots = np.asarray(prev_slots if prev_slots is not None else [-1] * n_slots, dtype=np.int64)
+        # Slots by their place in a run of back-to-back periods: first periods, then the ones after those, ...
+        self.run_steps = []
+        step = np.flatnonzero(self.prev_slots < 0)
+        while step.size:
+            self.run_steps.append(step)
+            step = np.flatnonzero(np.isin(self.prev_slots, step))
+        # Empty constraint tables are dropped so they cost nothing per generation
+        self.hard = hard if hard is not None and not hard.is_empty else None
+        self.soft = soft if soft is not None and not soft.is_empty else None
+
+    def evaluate(self, slots, teachers):
+        """ Returns one integer fitness per row; 0 means no violations and no soft penalty. """
+        hard, soft = self.evaluate_components(slots, teachers)
+        return hard * HARD_CONSTRAINT_WEIGHT + soft
+
+    def evaluate_components(self, slots, teachers):
+        """ Returns (hard violation count, soft penalty) per row. """
+        slots = np.asarray(slots, dtype=np.int64)
+        teachers = np.asarray(teachers, dtype=np.int64)
+        population_size, n_lessons = slots.shape
+        if n_lessons == 0:
+            return np.zeros(population_size, dtype=np.int64), np.zeros(population_size, dtype=np.int64)
+        row = np.arange(population_size, dtype=np.int64)[:, None]
+
+        # Every lesson beyond the first in an occupied cell is one clash.
+        teacher_cells = (row * self.n_teachers + teachers) * self.n_slots + slots
+        teacher_occupancy = np.bincount(
+            teacher_cells.ravel(), minlength=population_size * self.n_teachers * self.n_slots
+        ).reshape(population_size, -1)
+        teacher_clashes = n_lessons - np.count_nonzero(teacher_occupancy, axis=1)
+
+        group_cells = (row * self.n_groups + self.lesson_groups) * self.n_slots + slots
+        group_occupancy = np.bincount(
+            group_cells.ravel(), minlength=population_size * self.n_groups * self.n_slots
+        ).reshape(population_size, -1)
+        group_clashes = n_lessons - np.count_nonzero(group_occupancy, axis=1)
+
+        # Periods assigned above a teacher's weekly maximum.
+        teacher_load = np.bincount(
+            (row * self.n_teachers + teachers).ravel(), minlength=population_size * self.n_teachers
+        ).reshape(population_size, -1)
+        overload = np.clip(teacher_load - self.teacher_capacity, 0, None).sum(axis=1)
+
+        hard = teacher_clashes + group_clashes + overload
+        soft = np.zeros(population_size, dtype=np.int64)
+        for compiled, total in ((self.hard, hard), (self.soft, soft)):
+            if compiled is not None:
+                total += self._constraint_penalty(compiled, row, slots, teachers)
+        return hard, soft
+
+    def _constraint_penalty(self, compiled, row, slots, teachers):
+        population_size, n_lessons = slots.shape
+        penalty = compiled.teacher_slot[teachers, slots].sum(axis=1)
+        penalty += compiled.requirement_slot[np.arange(n_lessons), slots].sum(axis=1)
+        if compiled.daily_weight.any():
+            day_cells = (row * self.n_teachers + teachers) * self.n_days + self.slot_days[slots]
+            daily_load = np.bincount(
+                day_cells.ravel(), minlength=population_size * self.n_teachers * self.n_days
+            ).reshape(population_size, self.n_teachers, self.n_days)
+            excess = np.clip(daily_load - compiled.daily_limit[:, None], 0, None)
+            penalty += (excess * compiled.daily_weight[:, None]).sum(axis=(1, 2))
+        if compiled.consecutive_weight.any():
+            occupied = np.zeros((population_size, self.n_teachers, self.n_slots), dtype=np.int64)
+            occupied[row, teachers, slots] = 1
+            # run[p, t, s]: how many periods in a row teacher t has taught by the end of slot s
+            run = np.zeros_like(occupied)
+            for step in self.run_steps:
+                previous = self.prev_slots[step]
+                run[:, :, step] = occupied[:, :, step] * (np.where(previous >= 0, run[:, :, previous], 0) + 1)
+            excess = (run > compiled.consecutive_limit[:, None]).sum(axis=2)
+            penalty += (excess * compiled.consecutive_weight).sum(axis=1)
+        return penalty
+
+
+# --- Parallel evaluation ---
+# Each pool process keeps its own copy of the read-only fitness tables.
+_worker_engine = None
+
+
+def _init_evaluation_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _evaluate_chunk(slots, teachers):
+    return _worker_engine.evaluate(slots, teachers)
+
+
+class ParallelEvaluator:
+    """
+    Scores populations on a persistent process pool.
+
+    The fitness tables are handed to every worker once, when the pool
+    starts (inherited for free where fork is available). Each generation
+    only the stacked int16 genome chunks are sent and only the integer
+    scores come back.
+    """
+    def __init__(self, engine, workers, chunk_size=None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=_mp_context(),
+            initializer=_init_evaluation_worker, initargs=(engine,),
+        )
+        # Fork every worker now (with fork they all start on the first task), not in the middle of the run
+        self.pool.submit(int).result()
+
+    def evaluate(self, slots, teachers):
+        population_size = len(slots)
+        chunk_size = self.chunk_size or -(-population_size // self.workers)
+        futures = [
+            self.pool.submit(_evaluate_chunk, slots[start:start + chunk_size], teachers[start:start + chunk_size])
+            for start in range(0, population_size, chunk_size)
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+    def close(self):
+        self.pool.shutdown()
+
+
+def _mp_context():
+    """ Prefers fork so pool and island processes inherit the generator's tables. """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('fork' if 'fork' in methods else None)
+
+
+# --- Island model ---
+# Put in an island's outbox when it stops, so the next island no longer waits for its migrants
+ISLAND_FINISHED = 'finished'
+# Seconds the parent waits for an island message before checking the island processes are alive
+ISLAND_POLL_SECONDS = 1.0
+
+
+class IslandError(RuntimeError):
+    """ An island process failed or died before reporting its result. """
+
+
+def _run_island(generator, island, inboxes, messages, stop_event, migration_interval, budget, seed_sequence):
+    """
+    Evolves one sub-population in its own process. Every `migration_interval`
+    generations its elitism_count best genomes are sent to the next island on
+    the ring and the migrants from the previous island replace its worst ones.
+    An island stops waiting for migrants once the previous island has
+    finished or its own time budget is spent. Exceptions are sent to the
+    parent as an 'error' message.
+    `seed_sequence` is the island's own child of the run's seed.
+    """
+    generator.seed_streams(seed_sequence)
+    islands = len(inboxes)
+    outbox = inboxes[(island + 1) % islands]
+    # Unread migrants must not block this process from exiting
+    outbox.cancel_join_thread()
+
+    started = time.monotonic()
+    generator.evaluations = 0
+    generator.telemetry = GenerationTelemetry()
+    try:
+        best, best_generation, generation, stop_reason = _evolve_island(
+            generator, island, inboxes, messages, stop_event, migration_interval, budget, started
+        )
+    except Exception:
+        messages.put(('error', island, 0, traceback.format_exc()))
+        return
+    finally:
+        outbox.put(ISLAND_FINISHED)
+    messages.put(('done', island, generation, (
+        best.slots, best.teachers, best.fitness, best_generation, stop_reason, generator.evaluations,
+        generator.telemetry.as_dict(),
+    )))
+
+
+def _evolve_island(generator, island, inboxes, messages, stop_event, migration_interval, budget, started):
+    """ The GA loop of _run_island; returns (best, best_generation, generation, stop_reason). """
+    islands = len(inboxes)
+    outbox = inboxes[(island + 1) % islands]
+    best = None
+    best_generation = generation = 0
+    stop_reason = None
+    upstream_finished = False
+    deadline = budget.deadline(started)
+    population = generator.generate_initial_population(budget.deadline(started, SEEDING_TIME_SHARE))
+    while stop_reason is None:
+        generation += 1
+        scores = generator.calculate_population_fitness(population)
+        generator.telemetry.record_generation(generation, scores, population, generator.evaluations)
+        fitness_scores = sorted(zip(scores.tolist(), population), key=lambda x: x[0])
+        if best is None or fitness_scores[0][0] < best.fitness:
+            best, best_generation = fitness_scores[0][1], generation
+        messages.put(('progress', island, generation, best.fitness))
+        stop_reason = budget.stop_reason(
+            generation, time.monotonic() - started, best.fitness, generation - best_generation
+        )
+        if stop_reason == STOP_TARGET_REACHED:
+            stop_event.set()
+        elif stop_reason is None and stop_event.is_set():
+            stop_reason = STOP_STOPPED
+        if stop_reason:
+            break
+
+        if islands > 1 and generation % migration_interval == 0:
+            outbox.put([
+                (g.slots, g.teachers, g.fitness) for _, g in fitness_scores[:generator.parameters.elitism_count]
+            ])
+            migrants = None
+            while not (migrants is not None or upstream_finished or stop_event.is_set()
+                       or budget.out_of_time(time.monotonic() - started)):
+                try:
+                    migrants = inboxes[island].get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if migrants == ISLAND_FINISHED:
+                    migrants, upstream_finished = None, True
+            if migrants:
+                fitness_scores = sorted(
+                    fitness_scores[:-len(migrants)]
+                    + [(fitness, Genome(slots, teachers, fitness)) for slots, teachers, fitness in migrants],
+                    key=lambda x: x[0],
+                )
+
+        population = generator.breed(fitness_scores, deadline)
+    return best, best_generation, generation, stop_reason
+
+
+def _frozen(values):
+    """ Returns a read-only int16 vector so genomes can share it safely. """
+    if isinstance(values, np.ndarray) and values.dtype == GENOME_DTYPE and not values.flags.writeable:
+        return values
+    vector = np.array(values, dtype=GENOME_DTYPE)
+    vector.flags.writeable = False
+    return vector
+
+
+class Genome:
+    """
+    Compact individual: for every lesson requirement, its slot index (see
+    core.slots.SlotGrid) and its teacher index.
+
+    Both vectors are read-only. Operators build new vectors instead of
+    changing them, so children never alias their parents' genes and elites
+    can be carried between generations by reference. The fitness is cached
+    on the genome once it has been scored.
+    """
+    __slots__ = ('slots', 'teachers', 'fitness')
+
+    def __init__(self, slots, teachers, fitness=None):
+        self.slots = _frozen(slots)
+        self.teachers = _frozen(teachers)
+        self.fitness = fitness
+
+    def __len__(self):
+        return len(self.slots)
+
+
+class OccupancyState:
+    """
+    Mutable occupancy counters of one individual: teacher x slot and
+    group x slot cell counts, weekly teacher load and teacher x day load.
+
+    move_delta() and swap_delta() return the fitness change of a move from
+    the few counters it touches, in O(1) (consecutive-period limits recount
+    the teacher's day), without rescoring the timetable;
+    apply_move() and apply_swap() commit it. Used by local search.
+    """
+    def __init__(self, generator, genome):
+        tables = generator.delta_tables()
+        self.tables = tables
+        self.n_slots = n_slots = generator.n_slots
+        self.slots = genome.slots.tolist()
+        self.teachers = genome.teachers.tolist()
+        self.teacher_slot = [0] * (len(generator.teacher_ids) * n_slots)
+        self.group_slot = [0] * (generator.fitness_engine.n_groups * n_slots)
+        self.teacher_load = [0] * len(generator.teacher_ids)
+        self.teacher_day = [0] * (len(generator.teacher_ids) * tables['n_days'])
+        for i, (slot, teacher) in enumerate(zip(self.slots, self.teachers)):
+            self._add(i, slot, teacher)
+        hard, soft = generator.fitness_engine.evaluate_components(genome.slots[None, :], genome.teachers[None, :])
+        self.hard, self.soft = int(hard[0]), int(soft[0])
+
+    @property
+    def fitness(self):
+        return self.hard * HARD_CONSTRAINT_WEIGHT + self.soft
+
+    def to_genome(self):
+        return Genome(self.slots, self.teachers, self.fitness)
+
+    def _add(self, i, slot, teacher, amount=1):
+        tables = self.tables
+        self.teacher_slot[teacher * self.n_slots + slot] += amount
+        self.group_slot[tables['groups'][i] * self.n_slots + slot] += amount
+        self.teacher_load[teacher] += amount
+        self.teacher_day[teacher * tables['n_days'] + tables['slot_days'][slot]] += amount
+
+    def move_delta_components(self, i, slot, teacher=None):
+        """ (hard, soft) change if requirement i moved to `slot` (and `teacher`). """
+        old_slot, old_teacher = self.slots[i], self.teachers[i]
+        if teacher is None:
+            teacher = old_teacher
+        if slot == old_slot and teacher == old_teacher:
+            return 0, 0
+        tables = self.tables
+        n_slots = self.n_slots
+        # Leaving a cell only removes a clash if someone else stays; entering one adds a clash if occupied
+        hard = (self.teacher_slot[teacher * n_slots + slot] > 0) - (self.teacher_slot[old_teacher * n_slots + old_slot] > 1)
+        if slot != old_slot:
+            group = tables['groups'][i] * n_slots
+            hard += (self.group_slot[group + slot] > 0) - (self.group_slot[group + old_slot] > 1)
+        if teacher != old_teacher:
+            capacity = tables['capacity']
+            hard += (self.teacher_load[teacher] >= capacity[teacher]) - (self.teacher_load[old_teacher] > capacity[old_teacher])
+        soft = 0
+        old_day, day = tables['slot_days'][old_slot], tables['slot_days'][slot]
+        for level_tables, is_hard in ((tables['hard'], True), (tables['soft'], False)):
+            if level_tables is None:
+                continue
+            teacher_slot, requirement_slot = level_tables['teacher_slot'], level_tables['requirement_slot']
+            penalty = teacher_slot[teacher][slot] - teacher_slot[old_teacher][old_slot]
+            penalty += requirement_slot[i][slot] - requirement_slot[i][old_slot]
+            if level_tables['daily'] and (teacher != old_teacher or day != old_day):
+                limit, weight, n_days = level_tables['daily_limit'], level_tables['daily_weight'], tables['n_days']
+                penalty += weight[teacher] * (self.teacher_day[teacher * n_days + day] >= limit[teacher])
+                penalty -= weight[old_teacher] * (self.teacher_day[old_teacher * n_days + old_day] > limit[old_teacher])
+            if level_tables['consecutive']:
+                penalty += self.consecutive_delta(i, slot, teacher, level_tables)
+            if is_hard:
+                hard += penalty
+            else:
+                soft += penalty
+        return hard, soft
+
+    def move_delta(self, i, slot, teacher=None):
+        """ Fitness change if requirement i moved to `slot` (and `teacher`). """
+        hard, soft = self.move_delta_components(i, slot, teacher)
+        return hard * HARD_CONSTRAINT_WEIGHT + soft
+
+    def apply_move(self, i, slot, teacher=None):
+        if teacher is None:
+            teacher = self.teachers[i]
+        hard, soft = self.move_delta_components(i, slot, teacher)
+        self._add(i, self.slots[i], self.teachers[i], -1)
+        self._add(i, slot, teacher)
+        self.slots[i], self.teachers[i] = slot, teacher
+        self.hard += hard
+        self.soft += soft
+
+    def is_conflicted(self, i):
+        """ Whether requirement i takes part in a clash, an overload or a HARD constraint violation. """
+        tables = self.tables
+        slot, teacher = self.slots[i], self.teachers[i]
+        if self.teacher_slot[teacher * self.n_slots + slot] > 1:
+            return True
+        if self.group_slot[tables['groups'][i] * self.n_slots + slot] > 1:
+            return True
+        if self.teacher_load[teacher] > tables['capacity'][teacher]:
+            return True
+        hard = tables['hard']
+        if hard is not None:
+            if hard['teacher_slot'][teacher][slot] or hard['requirement_slot'][i][slot]:
+                return True
+            day = teacher * tables['n_days'] + tables['slot_days'][slot]
+            if hard['daily'] and hard['daily_weight'][teacher] and self.teacher_day[day] > hard['daily_limit'][teacher]:
+                return True
+            if (hard['consecutive'] and hard['consecutive_weight'][teacher]
+                    and self._consecutive_excess(teacher, tables['slot_days'][slot], hard['consecutive_limit'][teacher])):
+                return True
+        return False
+
+    def _consecutive_excess(self, teacher, day, limit):
+        """ Periods `teacher` teaches on `day` beyond `limit` back-to-back ones. """
+        prev_slot, base = self.tables['prev_slot'], teacher * self.n_slots
+        run = excess = 0
+        for slot in self.tables['day_slots'][day]:
+            if self.teacher_slot[base + slot]:
+                run = run + 1 if prev_slot[slot] >= 0 else 1
+                excess += run > limit
+            else:
+                run = 0
+        return excess
+
+    def consecutive_delta(self, i, slot, teacher, level_tables):
+        """ Change in one level's consecutive-period penalty if requirement i moved to `slot` and `teacher`. """
+        old_slot, old_teacher = self.slots[i], self.teachers[i]
+        limit, weight, slot_days = level_tables['consecutive_limit'], level_tables['consecutive_weight'], self.tables['slot_days']
+        days = [(t, day) for t, day in {(old_teacher, slot_days[old_slot]), (teacher, slot_days[slot])} if weight[t]]
+        if not days:
+            return 0
+        before = sum(weight[t] * self._consecutive_excess(t, day, limit[t]) for t, day in days)
+        # Recount with the lesson moved, then put it back
+        self.teacher_slot[old_teacher * self.n_slots + old_slot] -= 1
+        self.teacher_slot[teacher * self.n_slots + slot] += 1
+        after = sum(weight[t] * self._consecutive_excess(t, day, limit[t]) for t, day in days)
+        self.teacher_slot[teacher * self.n_slots + slot] -= 1
+        self.teacher_slot[old_teacher * self.n_slots + old_slot] += 1
+        return after - before
+
+    def swap_delta(self, i, j):
+        """ Fitness change if requirements i and j exchanged timeslots. """
+        slot_i, slot_j = self.slots[i], self.slots[j]
+        if slot_i == slot_j:
+            return 0
+        delta = self.move_delta(i, slot_j)
+        self.apply_move(i, slot_j)
+        delta += self.move_delta(j, slot_i)
+        self.apply_move(i, slot_i)
+        return delta
+
+    def apply_swap(self, i, j):
+        slot_i, slot_j = self.slots[i], self.slots[j]
+        self.apply_move(i, slot_j)
+        self.apply_move(j, slot_i)
+
 
 class TimetableGenerator:
-    # --- (__init__ method is the same) ---
-    def __init__(self, school_data):
+    def __init__(self, school_data, workers=1, random_share=RANDOM_INITIAL_SHARE,
+                 local_search_steps=LOCAL_SEARCH_STEPS, refinement_seconds=REFINEMENT_SECONDS,
+                 warm_start=None, seed=None, parameters=None, grid=None):
+        """
+        `workers` > 1 scores each generation on that many processes.
+        `random_share` is the fraction of the initial population built at
+        random instead of by the greedy seeding heuristic.
+        `local_search_steps` > 0 hill-climbs the elites every generation.
+        `refinement_seconds` > 0 runs simulated annealing on the best
+        elitism_count genomes after the GA, for that long in total.
+        `warm_start` is a previous run's assignments (see assignments()) to
+        seed the population from instead of starting from scratch.
+        `parameters` (GAParameters) sets the population size and operator
+        rates. `seed` makes runs reproducible; without one a random seed is drawn.
+        Either way it is returned in the result, so any run can be replayed
+        (except for time-bounded refinement and island stop timing).
+        `grid` (a SlotGrid) replaces the one built from school_data's
+        timeslots, e.g. to work on a stored timetable's grid.
+        """
+        self.workers = workers
+        self.parameters = parameters or GAParameters()
+        self.random_share = random_share
+        self.local_search_steps = local_search_steps
+        self.refinement_seconds = refinement_seconds
+        self.warm_start = warm_start
+        self.warm_start_stats = None
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(SEED_BITS)
+        self.seed_streams()
+        self.best_genome = None
+        self.evaluations = 0  # Genomes scored so far, for run statistics
+        self.telemetry = GenerationTelemetry()
+        self._delta_tables = None
+        self.evaluator = None
         self.teachers = {t['id']: t for t in school_data.get('teachers', [])}
         self.subjects = {s['id']: s for s in school_data.get('subjects', [])}
         self.student_groups = {sg['id']: sg for sg in school_data.get('student_groups', [])}
         self.lessons = school_data.get('lessons', [])
-        self.days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-        self.periods_in_day = 8
-        self.timeslots = [f"{day}-{period}" for day in self.days for period in range(1, self.periods_in_day + 1)]
-        self.lesson_requirements = []
+        # Slots are indexes into the TimeSlot rows sorted by day and start time (see core.slots)
+        self.grid = grid or SlotGrid.from_timeslots(school_data.get('timeslots', []))
+        self.days = self.grid.days
+        self.periods_in_day = self.grid.periods_in_day
+        self.n_slots = self.grid.n_slots
+        requirements = []
         for lesson_info in self.lessons:
             for _ in range(lesson_info['periods_per_week']):
-                self.lesson_requirements.append({
+                requirements.append({
                     "lesson_id": lesson_info['id'],
                     "subject_id": lesson_info['subject_id'],
                     "group_id": lesson_info['student_group_id'],
+                    "teacher_ids": tuple(lesson_info.get('teacher_ids') or ()),
                     "is_double_period": lesson_info.get('is_double_period', False)
                 })
-        print("Generator initialized.")
+        # Shared by every genome; index i is the requirement with unique_id i
+        self.lesson_requirements = tuple(requirements)
+
+        # Dense integer indexes used by the genomes and the fitness engine
+        self.teacher_ids = list(self.teachers)
+        self.teacher_index = {teacher_id: i for i, teacher_id in enumerate(self.teacher_ids)}
+        self.group_index = {group_id: i for i, group_id in enumerate(self.student_groups)}
+        for req in self.lesson_requirements:
+            self.group_index.setdefault(req['group_id'], len(self.group_index))
+        self.requirement_groups = _frozen([self.group_index[req['group_id']] for req in self.lesson_requirements])
+        # Teachers each requirement may be given: the lesson's own teachers, or anyone if none are set
+        all_teachers = tuple(range(len(self.teacher_ids)))
+        self.requirement_teachers = tuple(
+            tuple(self.teacher_index[t] for t in req['teacher_ids'] if t in self.teacher_index) or all_teachers
+            for req in self.lesson_requirements
+        )
+        self.teacher_capacity = np.array(
+            [t.get('max_periods_per_week', 0) for t in self.teachers.values()], dtype=np.int64
+        )
+        self.timeslot_row_slots = self.grid.timeslot_slot
 
-    # --- (run_generation method is the same) ---
-    def run_generation(self):
-        print("Starting KVS-compliant timetable generation...")
-        population = self.generate_initial_population()
+        self.hard_constraints, self.soft_constraints, self.constraint_warnings = compile_constraints(
+            self, school_data.get('constraints', [])
+        )
+        self.fitness_engine = FitnessEngine(
+            n_slots=self.n_slots,
+            lesson_groups=self.requirement_groups,
+            teacher_capacity=self.teacher_capacity,
+            slot_days=self.grid.slot_day,
+            hard=self.hard_constraints,
+            soft=self.soft_constraints,
+            prev_slots=self.grid.prev_slot,
+        )
+        # Cells not ruled out by a HARD constraint, used by the seeding heuristic
+        self.requirement_open = self.hard_constraints.requirement_slot == 0
+        self.teacher_open = self.hard_constraints.teacher_slot == 0
+        # Seeding difficulty: demand on each requirement's least loaded teacher and on its group
+        teacher_demand = np.zeros(len(self.teacher_ids))
+        for allowed in self.requirement_teachers:
+            teacher_demand[list(allowed)] += 1.0 / len(allowed)
+        teacher_pressure = teacher_demand / np.maximum(self.teacher_capacity, 1)
+        group_pressure = np.bincount(self.requirement_groups, minlength=self.fitness_engine.n_groups) / self.n_slots
+        self.seeding_pressure = np.array([
+            teacher_pressure[list(allowed)].min() + group_pressure[group] - len(allowed)
+            for allowed, group in zip(self.requirement_teachers, self.requirement_groups.tolist())
+        ])
+        logger.debug("Generator initialized: %d lesson requirements", len(self.lesson_requirements))
+
+    def seed_streams(self, seed_sequence=None):
+        """
+        Resets the instance's RNGs, a random.Random (self.rng) for scalar draws
+        and a NumPy Generator (self.np_rng) for vectors, from `seed_sequence`
+        (a numpy SeedSequence; default: the one of self.seed). Every run
+        starts from here, so the same seed gives the same run.
+        """
+        seed_sequence = seed_sequence or np.random.SeedSequence(self.seed)
+        python_sequence, numpy_sequence = seed_sequence.spawn(2)
+        self.rng = random.Random(int(python_sequence.generate_state(1, np.uint64)[0]))
+        self.np_rng = np.random.default_rng(numpy_sequence)
+
+    def run_generation(self, progress_callback=None, budget=None, on_started=None):
+        """
+        Runs the GA until `budget` (a SearchBudget, default: MAX_GENERATIONS
+        or fitness 0) says to stop. `progress_callback(generation, best_score)`
+        is called once per generation so callers (e.g. the job worker) can
+        report progress. `on_started()` is called once the evaluation pool's
+        processes are running; nothing is forked after it.
+        """
+        if self.workers > 1:
+            self.evaluator = ParallelEvaluator(self.fitness_engine, self.workers)
+        if on_started:
+            on_started()
+        try:
+            return self._run_generation(progress_callback, budget or SearchBudget())
+        finally:
+            if self.evaluator:
+                self.evaluator.close()
+                self.evaluator = None
+
+    def run_island_generation(self, islands, migration_interval=ISLAND_MIGRATION_INTERVAL,
+                              progress_callback=None, budget=None, on_started=None):
+        """
+        Island-model GA: `islands` sub-populations of population_size evolve
+        in parallel processes and exchange their best elitism_count genomes
+        along a ring every `migration_interval` generations. Each island
+        applies `budget` on its own; the first one to reach the target stops
+        the others. The best genome found on any island is returned.
+        `progress_callback` receives the furthest generation reached and the
+        best score across islands. `on_started()` is called once the island
+        processes are running.
+        """
+        logger.info("Starting island-model generation on %d islands (seed %d)", islands, self.seed)
+        self.telemetry = GenerationTelemetry()
+        # The islands get independent child streams; this process keeps its own for refinement
+        seed_sequence = np.random.SeedSequence(self.seed)
+        self.seed_streams(seed_sequence)
+        island_sequences = seed_sequence.spawn(islands)
+        if not self.lesson_requirements or not self.teachers or not self.student_groups:
+            return {"status": "error", "message": "Could not generate initial population. Check lesson requirements."}
+
+        started = time.monotonic()
+        context = _mp_context()
+        inboxes = [context.Queue() for _ in range(islands)]
+        messages = context.Queue()
+        stop_event = context.Event()
+        processes = [
+            context.Process(
+                target=_run_island,
+                args=(
+                    self, island, inboxes, messages, stop_event, migration_interval, budget or SearchBudget(),
+                    island_sequences[island],
+                ),
+            )
+            for island in range(islands)
+        ]
+        for process in processes:
+            process.start()
+        if on_started:
+            on_started()
+
+        best = best_island = None
+        best_score = None
+        best_generation = 0
+        stop_reason = None
+        evaluations = 0
+        furthest_generation = 0
+        finished = 0
+        try:
+            while finished < islands:
+                try:
+                    kind, island, generation, payload = messages.get(timeout=ISLAND_POLL_SECONDS)
+                except queue.Empty:
+                    dead = [i for i, process in enumerate(processes) if not process.is_alive()]
+                    crashed = [i for i in dead if processes[i].exitcode != 0]
+                    if crashed or len(dead) == islands:
+                        raise IslandError(
+                            f"Island {(crashed or dead)[0] + 1} exited (code {processes[(crashed or dead)[0]].exitcode}) "
+                            "without reporting a result"
+                        )
+                    continue
+                if kind == 'error':
+                    raise IslandError(f"Island {island + 1} failed:\n{payload}")
+                furthest_generation = max(furthest_generation, generation)
+                if kind == 'progress':
+                    best_score = payload if best_score is None else min(best_score, payload)
+                    if progress_callback:
+                        progress_callback(furthest_generation, best_score)
+                    continue
+                finished += 1
+                (slots, teachers, fitness, island_best_generation, island_stop_reason, island_evaluations,
+                 island_telemetry) = payload
+                evaluations += island_evaluations
+                self.telemetry.islands.append({"island": island, **island_telemetry})
+                logger.info(
+                    "Island %d stopped (%s) after %d generations with score %d",
+                    island + 1, island_stop_reason, generation, fitness,
+                )
+                # Ties go to the lowest island, not the first to finish, so a seeded run repeats
+                if best is None or (fitness, island) < (best.fitness, best_island):
+                    best, best_island = Genome(slots, teachers, fitness), island
+                    best_generation, stop_reason = island_best_generation, island_stop_reason
+        finally:
+            # On failure the other islands are told to stop, then killed if they do not
+            stop_event.set()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+
+        stats = {
+            "generations": furthest_generation,
+            "best_generation": best_generation,
+            "evaluations": evaluations,
+            "islands": islands,
+        }
+        self.telemetry.evaluations = evaluations
+        budget = budget or SearchBudget()
+        refinement_seconds = budget.remaining(time.monotonic() - started, self.refinement_seconds)
+        if refinement_seconds and best.fitness > budget.target_fitness:
+            best, stats["refinement"] = self.refine([best], refinement_seconds, budget.target_fitness)
+            if best.fitness <= budget.target_fitness:
+                stop_reason = STOP_TARGET_REACHED
+        stats["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        return self.build_result(best, stop_reason, stats)
+
+    def _run_generation(self, progress_callback, budget):
+        logger.info(
+            "Starting timetable generation: %d lesson requirements (seed %d)", len(self.lesson_requirements), self.seed
+        )
+        self.seed_streams()
+        started = time.monotonic()
+        self.evaluations = 0
+        self.telemetry = GenerationTelemetry()
+        deadline = budget.deadline(started)
+        population = self.generate_initial_population(budget.deadline(started, SEEDING_TIME_SHARE))
         if not population:
             return {"status": "error", "message": "Could not generate initial population. Check lesson requirements."}
 
-        for generation in range(MAX_GENERATIONS):
-            print(f"--- Generation {generation + 1}/{MAX_GENERATIONS} ---")
-            fitness_scores = [(self.calculate_fitness(timetable), timetable) for timetable in population]
-            fitness_scores.sort(key=lambda x: x[0])
-            best_score = fitness_scores[0][0]
-            print(f"Best Score in Generation {generation + 1}: {best_score}")
-            if best_score == 0:
-                print("Perfect solution found!")
-                best_timetable = fitness_scores[0][1]
-                return self.format_timetable_for_frontend(best_timetable)
-            
+        best = None
+        best_generation = generation = 0
+        stop_reason = None
+        while stop_reason is None:
+            generation += 1
+            scores = self.calculate_population_fitness(population)
+            self.telemetry.record_generation(generation, scores, population, self.evaluations)
+            fitness_scores = sorted(zip(scores.tolist(), population), key=lambda x: x[0])
+            if best is None or fitness_scores[0][0] < best.fitness:
+                best, best_generation = fitness_scores[0][1], generation
+            if progress_callback:
+                progress_callback(generation, best.fitness)
+            stop_reason = budget.stop_reason(
+                generation, time.monotonic() - started, best.fitness, generation - best_generation
+            )
+            if stop_reason is None:
+                population = self.breed(fitness_scores, deadline)
+
+        stats = {
+            "generations": generation,
+            "best_generation": best_generation,
+            "evaluations": self.evaluations,
+        }
+        refinement_seconds = budget.remaining(time.monotonic() - started, self.refinement_seconds)
+        if refinement_seconds and best.fitness > budget.target_fitness:
+            n_elites = self.parameters.elitism_count
+            elites = [best] + [genome for _, genome in fitness_scores[:n_elites] if genome is not best]
+            best, stats["refinement"] = self.refine(elites[:max(n_elites, 1)], refinement_seconds, budget.target_fitness)
+            if best.fitness <= budget.target_fitness:
+                stop_reason = STOP_TARGET_REACHED
+        logger.info(
+            "Generation finished (%s) after %d generations: best fitness %d", stop_reason, generation, best.fitness
+        )
+        stats["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        return self.build_result(best, stop_reason, stats)
+
+    def build_result(self, best, stop_reason, stats):
+        """ Frontend payload for the best genome plus why and how the search stopped. """
+        with self.telemetry.phase('formatting'):
+            result = self.format_timetable_for_frontend(best)
+        hard, soft = self.fitness_engine.evaluate_components(best.slots[None, :], best.teachers[None, :])
+        result["stop_reason"] = stop_reason
+        result["seed"] = self.seed
+        result["stats"] = {
+            "best_fitness": best.fitness,
+            "hard_violations": int(hard[0]),
+            "soft_penalty": int(soft[0]),
+            **stats,
+            "parameters": asdict(self.parameters),
+        }
+        if self.warm_start_stats:
+            result["stats"]["warm_start"] = self.warm_start_stats
+        if self.constraint_warnings:
+            result["constraint_warnings"] = self.constraint_warnings
+        self.best_genome = best
+        return result
+
+    def breed(self, fitness_scores, deadline=None):
+        """
+        Builds the next population from (score, genome) pairs sorted best first.
+        Elites are not hill-climbed any more once time.monotonic() passes `deadline`.
+        """
+        phase = self.telemetry.phase
+        parameters = self.parameters
+        n_elites = parameters.elitism_count
+        if self.local_search_steps:
+            with phase('local_search'):
+                elites = [
+                    genome if deadline is not None and time.monotonic() >= deadline
+                    else self.hill_climb(genome, self.local_search_steps)
+                    for _, genome in fitness_scores[:n_elites]
+                ]
+            fitness_scores = sorted(
+                [(genome.fitness, genome) for genome in elites] + fitness_scores[n_elites:], key=lambda x: x[0]
+            )
+        with phase('selection'):
             parents = self.selection(fitness_scores)
-            
-            children = []
-            while len(children) < POPULATION_SIZE - ELITISM_COUNT:
-                parent1, parent2 = random.sample(parents, 2)
+        
+        children = []
+        rng = self.rng
+        while len(children) < parameters.population_size - n_elites:
+            parent1, parent2 = rng.sample(parents, 2)
+            with phase('crossover'):
                 child = self.crossover(parent1, parent2)
-                if random.random() < MUTATION_RATE:
+            if rng.random() < parameters.mutation_rate:
+                with phase('mutation'):
                     child = self.mutation(child)
-                children.append(child)
-            
-            population = parents[:ELITISM_COUNT] + children
-
-        print("Algorithm finished. Returning best found solution.")
-        # This line was causing the crash
-        valid_timetables = [t for t in population if t is not None]
-        if not valid_timetables:
-            return {"status": "error", "message": "Algorithm could not find a valid solution."}
-        best_timetable = sorted([(self.calculate_fitness(t), t) for t in valid_timetables])[0][1]
-        return self.format_timetable_for_frontend(best_timetable)
-
-    # --- (generate_initial_population is the same) ---
-    def generate_initial_population(self):
+            children.append(child)
+        
+        return parents[:n_elites] + children
+
+    # --- Fitness ---
+    def calculate_population_fitness(self, population):
+        """ Scores every genome of the population, evaluating only the unscored ones in one batch. """
+        unscored = [genome for genome in population if genome.fitness is None]
+        if unscored:
+            self.evaluations += len(unscored)
+            evaluate = self.evaluator.evaluate if self.evaluator else self.fitness_engine.evaluate
+            with self.telemetry.phase('fitness'):
+                scores = evaluate(
+                    np.stack([genome.slots for genome in unscored]),
+                    np.stack([genome.teachers for genome in unscored]),
+                )
+            for genome, score in zip(unscored, scores.tolist()):
+                genome.fitness = score
+        return np.array([genome.fitness for genome in population], dtype=np.int64)
+
+    def calculate_fitness(self, genome):
+        """
+        HARD_CONSTRAINT_WEIGHT x (teacher clashes, group clashes, overload
+        periods and HARD constraint violations) + weighted SOFT penalties.
+        """
+        return int(self.calculate_population_fitness([genome])[0])
+
+    # --- Delta evaluation and local search ---
+    def delta_tables(self):
+        """ Plain-list copies of the fitness tables, for fast scalar lookups in OccupancyState. """
+        if self._delta_tables is None:
+            engine = self.fitness_engine
+
+            def level_tables(compiled):
+                if compiled is None:
+                    return None
+                return {
+                    'teacher_slot': compiled.teacher_slot.tolist(),
+                    'requirement_slot': compiled.requirement_slot.tolist(),
+                    'daily': bool(compiled.daily_weight.any()),
+                    'daily_limit': compiled.daily_limit.tolist(),
+                    'daily_weight': compiled.daily_weight.tolist(),
+                    'consecutive': bool(compiled.consecutive_weight.any()),
+                    'consecutive_limit': compiled.consecutive_limit.tolist(),
+                    'consecutive_weight': compiled.consecutive_weight.tolist(),
+                }
+            self._delta_tables = {
+                'groups': self.requirement_groups.tolist(),
+                'capacity': self.teacher_capacity.tolist(),
+                'slot_days': engine.slot_days.tolist(),
+                'n_days': engine.n_days,
+                'prev_slot': engine.prev_slots.tolist(),
+                'day_slots': self.grid.day_slots,
+                'hard': level_tables(engine.hard),
+                'soft': level_tables(engine.soft),
+            }
+        return self._delta_tables
+
+    def hill_climb(self, genome, steps):
+        """
+        First-improvement local search: tries `steps` random moves (a slot
+        swap, a move to another slot, or another of the lesson's teachers)
+        and keeps every move that does not make the fitness worse.
+        Returns a new genome with its fitness set.
+        """
+        state = OccupancyState(self, genome)
+        n_lessons = len(genome)
+        rng = self.rng
+        for _ in range(steps):
+            if state.fitness == 0:
+                break
+            i = rng.randrange(n_lessons)
+            kind = rng.random()
+            if kind < 0.5:
+                j = rng.randrange(n_lessons)
+                if state.swap_delta(i, j) <= 0:
+                    state.apply_swap(i, j)
+            elif kind < 0.9:
+                slot = rng.randrange(self.n_slots)
+                if state.move_delta(i, slot) <= 0:
+                    state.apply_move(i, slot)
+            else:
+                teacher = rng.choice(self.requirement_teachers[i])
+                if state.move_delta(i, state.slots[i], teacher) <= 0:
+                    state.apply_move(i, state.slots[i], teacher)
+        return state.to_genome()
+
+    def refine(self, genomes, seconds, target_fitness=0):
+        """
+        Memetic refinement: simulated annealing on each genome in turn,
+        sharing `seconds` between them. Moves are aimed at requirements that
+        are still in conflict (the conflict list is refreshed periodically),
+        so the last few clashes the GA leaves behind get removed.
+        Returns (best genome, refinement statistics).
+        """
+        started = time.monotonic()
+        start_fitness = min(genome.fitness for genome in genomes)
+        best = min(genomes, key=lambda genome: genome.fitness)
+        moves = 0
+        for index, genome in enumerate(genomes):
+            remaining = seconds - (time.monotonic() - started)
+            if remaining <= 0 or best.fitness <= target_fitness:
+                break
+            candidate, tried = self._anneal(genome, remaining / (len(genomes) - index), target_fitness)
+            moves += tried
+            if candidate.fitness < best.fitness:
+                best = candidate
+        self.telemetry.phase_seconds['refinement'] += time.monotonic() - started
+        logger.info("Refinement: %d -> %d after %d moves", start_fitness, best.fitness, moves)
+        return best, {
+            "start_fitness": start_fitness,
+            "end_fitness": best.fitness,
+            "moves": moves,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+
+    def _anneal(self, genome, seconds, target_fitness):
+        state = OccupancyState(self, genome)
+        n_lessons = len(genome)
+        rng = self.rng
+        best_fitness = state.fitness
+        best_slots, best_teachers = list(state.slots), list(state.teachers)
+        deadline = time.monotonic() + seconds
+        # Temperature falls geometrically from half a hard violation to ~0 over the time budget
+        start_temperature, end_temperature = HARD_CONSTRAINT_WEIGHT / 2, 0.5
+        temperature = start_temperature
+        conflicted = []
+        moves = 0
+        while best_fitness > target_fitness:
+            if moves % REFINEMENT_REFRESH_MOVES == 0:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                progress = 1 - (deadline - now) / seconds
+                temperature = start_temperature * (end_temperature / start_temperature) ** progress
+                conflicted = [i for i in range(n_lessons) if state.is_conflicted(i)]
+            moves += 1
+            i = rng.choice(conflicted) if conflicted and rng.random() < 0.8 else rng.randrange(n_lessons)
+            kind = rng.random()
+            if kind < 0.4:
+                j = rng.randrange(n_lessons)
+                delta = state.swap_delta(i, j)
+                if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                    state.apply_swap(i, j)
+                else:
+                    continue
+            else:
+                slot = rng.randrange(self.n_slots)
+                teacher = rng.choice(self.requirement_teachers[i]) if kind > 0.9 else None
+                delta = state.move_delta(i, slot, teacher)
+                if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                    state.apply_move(i, slot, teacher)
+                else:
+                    continue
+            if state.fitness < best_fitness:
+                best_fitness = state.fitness
+                best_slots, best_teachers = list(state.slots), list(state.teachers)
+        return Genome(best_slots, best_teachers, best_fitness), moves
+
+    # --- Initial population ---
+    def generate_initial_population(self, deadline=None):
+        """
+        Builds population_size genomes: a `random_share` of them uniformly at
+        random, the rest with the greedy seeding heuristic. With a warm start,
+        the previous timetable and mutated copies of it come first. Once
+        time.monotonic() passes `deadline`, the rest is filled at random.
+        """
         population = []
         if not self.lesson_requirements or not self.teachers or not self.student_groups:
             return population # Return empty if no data to process
-        for _ in range(POPULATION_SIZE):
-            timetable = []
-            for i, lesson_req in enumerate(self.lesson_requirements):
-                lesson_assignment = {
-                    "unique_id": i,
-                    **lesson_req,
-                    "teacher_id": random.choice(list(self.teachers.keys())),
-                    "timeslot": random.choice(self.timeslots)
-                }
-                timetable.append(lesson_assignment)
-            population.append(timetable)
+        with self.telemetry.phase('initial_population'):
+            if self.warm_start:
+                population = self.warm_start_population()
+            population_size = self.parameters.population_size
+            n_random = int(round((population_size - len(population)) * self.random_share))
+            for _ in range(n_random):
+                population.append(self.random_individual())
+            while len(population) < population_size:
+                if deadline is not None and time.monotonic() >= deadline:
+                    population.extend(self.random_individual() for _ in range(population_size - len(population)))
+                    break
+                population.append(self.greedy_individual())
         return population
 
-    # --- (selection method is the same) ---
+    # --- Warm start ---
+    def assignments(self, genome):
+        """
+        Storable form of a genome: one {lesson_id, teacher_id, slot} per
+        requirement, in requirement order, so the n-th entry of a lesson is
+        its n-th period whatever other lessons were added or removed.
+        """
+        return [
+            {"lesson_id": req['lesson_id'], "teacher_id": self.teacher_ids[teacher], "slot": slot}
+            for req, slot, teacher in zip(self.lesson_requirements, genome.slots.tolist(), genome.teachers.tolist())
+        ]
+
+    def warm_start_population(self):
+        """
+        Maps the previous assignments back onto the current requirements
+        (by lesson id and period number). A placement is kept only if it is
+        still feasible: the lesson still exists, the teacher may still teach
+        it and has weekly (and HARD daily) capacity left, no HARD constraint
+        rules out the cell, and it does not clash with a placement kept
+        before it. Only the others are re-placed greedily around the kept
+        ones. Returns the repaired timetable followed by mutated copies of it
+        (WARM_START_SHARE of the population).
+        """
+        previous = defaultdict(list)
+        for assignment in self.warm_start:
+            previous[assignment['lesson_id']].append(assignment)
+        hard = self.hard_constraints
+        slot_days = self.grid.slot_day
+        group_busy = np.zeros((self.fitness_engine.n_groups, self.n_slots), dtype=bool)
+        teacher_busy = np.zeros((len(self.teacher_ids), self.n_slots), dtype=bool)
+        teacher_load = np.zeros(len(self.teacher_ids), dtype=np.int64)
+        teacher_day = np.zeros((len(self.teacher_ids), len(self.days)), dtype=np.int64)
+        fixed = {}
+        seen = defaultdict(int)
+        for i, req in enumerate(self.lesson_requirements):
+            occurrence = seen[req['lesson_id']]
+            seen[req['lesson_id']] += 1
+            if occurrence >= len(previous[req['lesson_id']]):
+                continue
+            assignment = previous[req['lesson_id']][occurrence]
+            teacher, slot = self.teacher_index.get(assignment['teacher_id']), assignment['slot']
+            if teacher not in self.requirement_teachers[i] or not 0 <= slot < self.n_slots:
+                continue
+            group, day = self.requirement_groups[i], slot_days[slot]
+            if (not self.requirement_open[i, slot] or not self.teacher_open[teacher, slot]
+                    or group_busy[group, slot] or teacher_busy[teacher, slot]
+                    or teacher_load[teacher] >= self.teacher_capacity[teacher]
+                    or (hard.daily_weight[teacher] and teacher_day[teacher, day] >= hard.daily_limit[teacher])):
+                continue
+            fixed[i] = (slot, teacher)
+            group_busy[group, slot] = teacher_busy[teacher, slot] = True
+            teacher_load[teacher] += 1
+            teacher_day[teacher, day] += 1
+
+        base = self.greedy_individual(fixed=fixed)
+        self.warm_start_stats = {"kept": len(fixed), "repaired": len(self.lesson_requirements) - len(fixed)}
+        logger.info("Warm start: kept %d placements, repaired %d", len(fixed), self.warm_start_stats['repaired'])
+        population = [base]
+        for _ in range(int(self.parameters.population_size * WARM_START_SHARE) - 1):
+            child = base
+            for _ in range(self.rng.randint(1, 3)):
+                child = self.mutation(child)
+            population.append(child)
+        return population
+
+    def random_individual(self):
+        """ Uniformly random slots; teachers drawn from each lesson's own teachers. """
+        n_lessons = len(self.lesson_requirements)
+        return Genome(
+            slots=self.np_rng.integers(0, self.n_slots, size=n_lessons),
+            teachers=[self.rng.choice(allowed) for allowed in self.requirement_teachers],
+        )
+
+    def greedy_individual(self, fixed=None):
+        """
+        Randomized greedy construction, most constrained requirements first
+        (a static DSatur-style order: fewest eligible teachers, then busiest
+        teachers and groups, with random tie-breaking). Each requirement goes
+        to a random slot that is still free for its group and for one of the
+        lesson's teachers with weekly capacity left; the lesson's previously
+        chosen teacher is preferred so its periods stay with one person.
+        Cells ruled out by HARD constraints are avoided. When no clash-free
+        slot is left, a free slot for the group is used.
+
+        `fixed` maps requirement indexes to (slot, teacher) placements that are
+        kept as they are; only the other requirements are placed (repair mode).
+        """
+        fixed = fixed or {}
+        n_lessons = len(self.lesson_requirements)
+        rng = self.rng
+        group_busy = np.zeros((self.fitness_engine.n_groups, self.n_slots), dtype=bool)
+        teacher_busy = np.zeros((len(self.teacher_ids), self.n_slots), dtype=bool)
+        teacher_load = np.zeros(len(self.teacher_ids), dtype=np.int64)
+        lesson_teacher = {}
+        slots = np.zeros(n_lessons, dtype=np.int64)
+        teachers = np.zeros(n_lessons, dtype=np.int64)
+        for i, (slot, teacher) in fixed.items():
+            slots[i], teachers[i] = slot, teacher
+            group_busy[self.requirement_groups[i], slot] = teacher_busy[teacher, slot] = True
+            teacher_load[teacher] += 1
+            lesson_teacher.setdefault(self.lesson_requirements[i]['lesson_id'], teacher)
+
+        for i in self._seeding_order():
+            if i in fixed:
+                continue
+            group = self.requirement_groups[i]
+            lesson_id = self.lesson_requirements[i]['lesson_id']
+            allowed = self.requirement_teachers[i]
+            candidates = [t for t in allowed if teacher_load[t] < self.teacher_capacity[t]] or list(allowed)
+            rng.shuffle(candidates)
+            if lesson_id in lesson_teacher and lesson_teacher[lesson_id] in candidates:
+                candidates.remove(lesson_teacher[lesson_id])
+                candidates.insert(0, lesson_teacher[lesson_id])
+
+            group_free = ~group_busy[group] & self.requirement_open[i]
+            slot = teacher = None
+            for candidate in candidates:
+                free = np.flatnonzero(group_free & ~teacher_busy[candidate] & self.teacher_open[candidate])
+                if free.size:
+                    slot, teacher = int(free[rng.randrange(free.size)]), candidate
+                    break
+            if slot is None:
+                free = np.flatnonzero(~group_busy[group])
+                slot = int(free[rng.randrange(free.size)]) if free.size else rng.randrange(self.n_slots)
+                teacher = candidates[0]
+
+            slots[i], teachers[i] = slot, teacher
+            group_busy[group, slot] = teacher_busy[teacher, slot] = True
+            teacher_load[teacher] += 1
+            lesson_teacher.setdefault(lesson_id, teacher)
+        return Genome(slots=slots, teachers=teachers)
+
+    def _seeding_order(self):
+        """ Requirement indexes, hardest first, randomized within equal difficulty. """
+        noise = self.np_rng.random(len(self.seeding_pressure)) * 0.1
+        return np.argsort(-(self.seeding_pressure + noise), kind='stable').tolist()
+
     def selection(self, fitness_scores):
-        elites = [fs[1] for fs in fitness_scores[:ELITISM_COUNT]]
+        n_elites, tournament_size = self.parameters.elitism_count, self.parameters.tournament_size
+        elites = [fs[1] for fs in fitness_scores[:n_elites]]
         selected = []
         # Filter out any None values that might have slipped through
         valid_scores = [fs for fs in fitness_scores if fs[1] is not None]
         if not valid_scores: return elites # Return only elites if no other valid parents
-        for _ in range(POPULATION_SIZE - ELITISM_COUNT):
-            tournament = random.sample(valid_scores, min(10, len(valid_scores)))
+        for _ in range(self.parameters.population_size - n_elites):
+            tournament = self.rng.sample(valid_scores, min(tournament_size, len(valid_scores)))
             winner = min(tournament, key=lambda x: x[0])
             selected.append(winner[1])
         return elites + selected
 
-    # --- CORRECTED Crossover Function ---
+    # --- Crossover: one-point, builds new vectors ---
     def crossover(self, parent1, parent2):
         """ Combines two parents to create a child. """
-        if not parent1 or not parent2:
-            return parent1 or parent2 # Return a valid parent if one is invalid
-        crossover_point = random.randint(1, len(parent1) - 1)
-        child = parent1[:crossover_point] + parent2[crossover_point:]
-        return child # This now correctly returns the new child timetable
-
-    # --- (mutation method is the same) ---
-    def mutation(self, timetable):
-        if not timetable: return timetable
-        lesson_to_mutate = random.choice(timetable)
-        lesson_to_swap_with = random.choice(timetable)
-        lesson_to_mutate['timeslot'], lesson_to_swap_with['timeslot'] = lesson_to_swap_with['timeslot'], lesson_to_mutate['timeslot']
-        return timetable
-
-    # --- (format_timetable_for_frontend is the same) ---
-    def format_timetable_for_frontend(self, timetable):
-        all_schedules = []
-        for group_id, group_info in self.student_groups.items():
-            scheduled_lessons = []
-            unique_lessons = {}
-            for lesson in timetable:
-                if lesson['group_id'] == group_id:
-                    lesson_key = (lesson['timeslot'], lesson['group_id'])
-                    if lesson_key not in unique_lessons:
-                        subject = self.subjects[lesson['subject_id']]['subject_name']
-                        teacher_obj = self.teachers[lesson['teacher_id']]
-                        teacher = f"{teacher_obj['first_name']}"
-                        day, period = lesson['timeslot'].split('-')
-                        unique_lessons[lesson_key] = {
-                            "id": lesson['unique_id'],
-                            "subject": subject,
-                            "teacher": teacher,
-                            "day": day,
-                            "timeslot": f"Period {period}"
-                        }
-            group_schedule = {
+        if len(parent1) < 2:
+            return parent1 # Nothing to cut; the immutable parent can be shared
+        crossover_point = self.rng.randint(1, len(parent1) - 1)
+        return Genome(
+            slots=np.concatenate((parent1.slots[:crossover_point], parent2.slots[crossover_point:])),
+            teachers=np.concatenate((parent1.teachers[:crossover_point], parent2.teachers[crossover_point:])),
+        )
+
+    # --- Mutation: swaps the timeslots of two lessons on a copy ---
+    def mutation(self, genome):
+        if not len(genome): return genome
+        i, j = self.rng.randrange(len(genome)), self.rng.randrange(len(genome))
+        slots = genome.slots.copy()
+        slots[i], slots[j] = slots[j], slots[i]
+        return Genome(slots=slots, teachers=genome.teachers)
+
+    # --- Decoding: genome -> frontend strings, done once at the end ---
+    def format_timetable_for_frontend(self, genome):
+        """
+        Group schedules, teacher schedules and a school-wide slot matrix,
+        built in one pass that buckets the lessons by group, teacher and slot.
+        All FRONTEND_VIEWS are built whatever the request asked for: the
+        result is stored on the job and in the result cache, where later
+        requests (and identical generate requests) may ask for other views,
+        and this runs once per job in the worker, not per request.
+        """
+        grid = self.grid
+        period_labels = grid.period_labels()
+        slot_labels = [grid.labels(slot) for slot in range(grid.n_slots)]
+        by_group, by_teacher = defaultdict(dict), defaultdict(dict)
+        by_slot = [[[] for _ in self.days] for _ in period_labels]
+        for unique_id, (lesson, slot, teacher) in enumerate(
+            zip(self.lesson_requirements, genome.slots.tolist(), genome.teachers.tolist())
+        ):
+            teacher_id = self.teacher_ids[teacher]
+            subject = self.subjects[lesson['subject_id']]['subject_name']
+            teacher_name = f"{self.teachers[teacher_id]['name']}"
+            group_name = self.student_groups[lesson['group_id']]['group_name']
+            day, timeslot = slot_labels[slot]
+            # A group or teacher shows one lesson per slot, the first one placed there
+            if slot not in by_group[lesson['group_id']]:
+                by_group[lesson['group_id']][slot] = {
+                    "id": unique_id, "subject": subject, "teacher": teacher_name, "day": day, "timeslot": timeslot,
+                }
+            if slot not in by_teacher[teacher_id]:
+                by_teacher[teacher_id][slot] = {
+                    "id": unique_id, "subject": subject, "student_group": group_name, "day": day, "timeslot": timeslot,
+                }
+            day_index, period = grid.cells[slot]
+            by_slot[period][day_index].append({
+                "id": unique_id, "subject": subject, "teacher": teacher_name, "student_group": group_name,
+            })
+        all_schedules = [
+            {
                 "student_group_name": group_info['group_name'],
                 "days": self.days,
-                "timeslots": [f"Period {i}" for i in range(1, self.periods_in_day + 1)],
-                "scheduled_lessons": list(unique_lessons.values())
+                "timeslots": period_labels,
+                "scheduled_lessons": list(by_group[group_id].values()),
+            }
+            for group_id, group_info in self.student_groups.items()
+        ]
+        teacher_schedules = [
+            {
+                "teacher_id": teacher_id,
+                "teacher_name": teacher_info['name'],
+                "days": self.days,
+                "timeslots": period_labels,
+                "scheduled_lessons": list(by_teacher[teacher_id].values()),
             }
-            all_schedules.append(group_schedule)
+            for teacher_id, teacher_info in self.teachers.items()
+        ]
         return {
             "status": "complete",
             "message": "All timetables generated successfully.",
-            "schedules": all_schedules
+            "schedules": all_schedules,
+            "teacher_schedules": teacher_schedules,
+            # cells[period][day]: every lesson taught in that slot
+            "slot_matrix": {"days": self.days, "timeslots": period_labels, "cells": by_slot},
         }
\ No newline at end of file
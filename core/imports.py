@@ -0,0 +1,195 @@
+# core/imports.py
+"""
+Bulk import of school master data from an xlsx workbook or CSV files.
+
+A workbook has one sheet per table, named after it ("Teachers",
+"Subjects", "Student Groups", "Lessons"); a CSV file holds one table.
+The first row names the columns:
+
+    teachers        name, designation, max_periods_per_week
+    subjects        subject_name, subject_code
+    student_groups  group_name, grade_level
+    lessons         subject, student_group, teachers, periods_per_week
+
+Lessons refer to subjects, groups and teachers by name (teachers separated
+by "," or ";"), either rows already in the database or rows of the same
+import. Files are read as streams (openpyxl read-only mode), rows are
+validated with the API serializers in batches of IMPORT_BATCH_SIZE, and
+valid rows are written with bulk_create, all in one transaction. Invalid
+rows are skipped and reported in the summary.
+"""
+import csv
+import io
+import re
+from collections import defaultdict
+
+import openpyxl
+from django.db import transaction
+
+from .cache import clear_results
+from .models import Teacher, Subject, StudentGroup
+from .serializers import TeacherSerializer, SubjectSerializer, StudentGroupSerializer, LessonSerializer
+
+IMPORT_BATCH_SIZE = 500
+# In import order: lessons refer to the other three
+IMPORT_TABLES = ('teachers', 'subjects', 'student_groups', 'lessons')
+TABLE_ALIASES = {'groups': 'student_groups', 'classes': 'student_groups'}
+# Tables looked up by name: (model, serializer, name field)
+NAMED_TABLES = {
+    'teachers': (Teacher, TeacherSerializer, 'name'),
+    'subjects': (Subject, SubjectSerializer, 'subject_name'),
+    'student_groups': (StudentGroup, StudentGroupSerializer, 'group_name'),
+}
+TEACHER_SEPARATORS = re.compile(r'[,;]')
+
+
+def _normalize(name):
+    return re.sub(r'[\s\-]+', '_', str(name).strip().lower())
+
+
+def table_name(name):
+    """ The import table a sheet or file name stands for, or None. """
+    name = _normalize(name)
+    name = TABLE_ALIASES.get(name, name)
+    return name if name in IMPORT_TABLES else None
+
+
+def _records(rows):
+    """ (row number, {column: value}) for every non-empty row below the header row. """
+    rows = iter(rows)
+    header = [_normalize(cell) if cell is not None else None for cell in next(rows, ())]
+    for number, values in enumerate(rows, start=2):
+        values = [value.strip() if isinstance(value, str) else value for value in values]
+        if all(value is None or value == '' for value in values):
+            continue
+        yield number, {key: value for key, value in zip(header, values) if key}
+
+
+class SchoolImporter:
+    """ Collects workbooks and CSV files, then imports them table by table with run(). """
+    def __init__(self):
+        self.sources = defaultdict(list)  # table -> [(source name, callable returning records)]
+        self.workbooks = []
+        self.summary = {table: {"created": 0, "rejected": []} for table in IMPORT_TABLES}
+        self.names = {}
+
+    def add_workbook(self, file, source=''):
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        self.workbooks.append(workbook)
+        for worksheet in workbook.worksheets:
+            table = table_name(worksheet.title)
+            if table:
+                self.sources[table].append(
+                    (f"{source}:{worksheet.title}", lambda ws=worksheet: _records(ws.iter_rows(values_only=True)))
+                )
+
+    def add_csv(self, file, table, source=''):
+        def records():
+            text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+            return _records(csv.reader(text))
+        self.sources[table].append((source, records))
+
+    def run(self):
+        """ Imports every table in one transaction and returns the summary. """
+        try:
+            with transaction.atomic():
+                for table in NAMED_TABLES:
+                    self.names[table] = self._name_map(table)
+                for table in IMPORT_TABLES:
+                    for source, records in self.sources[table]:
+                        self._import(table, source, records())
+        finally:
+            for workbook in self.workbooks:
+                workbook.close()
+        if any(counts["created"] for counts in self.summary.values()):
+            # bulk_create sends no signals, so cached generation results must be dropped here
+            clear_results()
+        return self.summary
+
+    # --- Name lookups ---
+    def _name_map(self, table):
+        model, _, field = NAMED_TABLES[table]
+        names = defaultdict(list)
+        for pk, name in model.objects.values_list('pk', field):
+            names[name.casefold()].append(pk)
+        return names
+
+    def _lookup(self, table, name, errors, key):
+        ids = self.names[table].get(str(name).casefold()) if name not in (None, '') else None
+        if not ids:
+            errors[key] = f"No {table.replace('_', ' ')[:-1]} named {name!r}."
+        elif len(ids) > 1:
+            errors[key] = f"{name!r} matches {len(ids)} rows."
+        else:
+            return ids[0]
+
+    def _lesson_data(self, row):
+        """ A lesson row with names replaced by ids, and the lookup errors. """
+        errors = {}
+        data = {
+            "subject": self._lookup('subjects', row.get('subject'), errors, 'subject'),
+            "student_group": self._lookup('student_groups', row.get('student_group'), errors, 'student_group'),
+            "periods_per_week": row.get('periods_per_week'),
+            "teachers": [],
+        }
+        for name in TEACHER_SEPARATORS.split(str(row.get('teachers') or '')):
+            if name.strip():
+                data["teachers"].append(self._lookup('teachers', name.strip(), errors, 'teachers'))
+        return data, errors
+
+    # --- Import ---
+    def _import(self, table, source, records):
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                self._import_batch(table, source, batch)
+                batch = []
+        if batch:
+            self._import_batch(table, source, batch)
+
+    def _import_batch(self, table, source, batch):
+        serializer_class = NAMED_TABLES[table][1] if table in NAMED_TABLES else LessonSerializer
+        context = {'preloaded': {}}
+        valid, new_names = [], []
+        for number, row in batch:
+            errors = {}
+            if table == 'lessons':
+                row, errors = self._lesson_data(row)
+            else:
+                name = row.get(NAMED_TABLES[table][2])
+                if name not in (None, '') and str(name).casefold() in self.names[table]:
+                    errors[NAMED_TABLES[table][2]] = f"{name!r} already exists."
+            serializer = serializer_class(data=row, context=context)
+            if not serializer.is_valid():
+                errors = {**serializer.errors, **errors}
+            if errors:
+                self.summary[table]["rejected"].append({"source": source, "row": number, "errors": errors})
+                continue
+            valid.append(serializer.validated_data)
+            if table in NAMED_TABLES:
+                name = str(serializer.validated_data[NAMED_TABLES[table][2]]).casefold()
+                # Reserve the name so a repeat later in the file is rejected too
+                self.names[table][name] = [None]
+                new_names.append(name)
+        objects = serializer_class(many=True, context=context).create(valid)
+        for name, obj in zip(new_names, objects):
+            self.names[table][name] = [obj.pk]
+        self.summary[table]["created"] += len(objects)
+
+
+def import_school(files):
+    """
+    Imports (name, file) pairs: .xlsx files as workbooks, .csv files as the
+    table named by the file name (e.g. teachers.csv). Returns the summary.
+    """
+    importer = SchoolImporter()
+    for name, file in files:
+        if name.lower().endswith('.xlsx'):
+            importer.add_workbook(file, source=name)
+            continue
+        table = table_name(re.sub(r'\.csv$', '', name.rsplit('/', 1)[-1], flags=re.I))
+        if table is None:
+            raise ValueError(f"Cannot tell which table {name!r} holds; name it e.g. teachers.csv.")
+        importer.add_csv(file, table, source=name)
+    return importer.run()
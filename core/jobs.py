@@ -0,0 +1,326 @@
+# core/jobs.py
+"""
+Background timetable generation.
+
+`POST /api/generate/` only enqueues a GenerationJob row. Worker processes
+started with `manage.py run_generation_worker` claim pending jobs, run the
+GA and write progress and the final payload back to the row, so throughput
+scales with the number of worker processes instead of gunicorn workers.
+
+While a job runs, its worker touches `heartbeat_at` every HEARTBEAT_INTERVAL
+seconds. Jobs whose worker died (no heartbeat for
+GENERATION_JOB_STALE_SECONDS) are queued again by the next worker that looks
+for work, or failed once they have been claimed GENERATION_JOB_MAX_ATTEMPTS
+times.
+"""
+import dataclasses
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import fingerprint, get_cached_result, store_result
+from .generator import (
+    TimetableGenerator, SearchBudget, GAParameters, BUDGET_PROFILES, MAX_GENERATIONS, auto_parameters,
+)
+from .models import (
+    Teacher, Subject, StudentGroup, TimeSlot, Lesson,
+    ConstraintInstance, ConstraintParameter, GenerationJob, AlgorithmSettings
+)
+from .slots import SlotGrid
+from .telemetry import profiling
+from .timetables import save_timetable, warm_start_assignments
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between two progress writes for the same job
+PROGRESS_UPDATE_INTERVAL = 1.0
+# Seconds between two heartbeats of a running job; well below GENERATION_JOB_STALE_SECONDS
+HEARTBEAT_INTERVAL = 30.0
+# Job parameters that do not change the result, so are left out of its fingerprint
+RUN_ONLY_PARAMETERS = ('profiler',)
+
+
+def load_school_data():
+    """ Reads everything the generator needs from the database. """
+    lesson_teachers = defaultdict(list)
+    for lesson_id, teacher_id in Lesson.teachers.through.objects.order_by('id').values_list('lesson_id', 'teacher_id'):
+        lesson_teachers[lesson_id].append(teacher_id)
+    lessons = list(Lesson.objects.order_by('id').values())
+    for lesson in lessons:
+        lesson['teacher_ids'] = lesson_teachers.get(lesson['id'], [])
+
+    parameters = defaultdict(dict)
+    for instance_id, key, value in ConstraintParameter.objects.order_by('id').values_list(
+        'instance_id', 'parameter_key', 'parameter_value'
+    ):
+        parameters[instance_id][key] = value
+    constraints = [
+        {**instance, 'parameters': parameters[instance['id']]}
+        for instance in ConstraintInstance.objects.annotate(type_name=F('constraint_type__type_name')).order_by(
+            'id'
+        ).values('id', 'type_name', 'constraint_level', 'weight')
+    ]
+    # Ordered by id so the same data always gives the same generator indexes
+    return {
+        "teachers": list(Teacher.objects.order_by('id').values()),
+        "subjects": list(Subject.objects.order_by('id').values()),
+        "student_groups": list(StudentGroup.objects.order_by('id').values()),
+        "timeslots": list(TimeSlot.objects.order_by('id').values()),
+        "lessons": lessons,
+        "constraints": constraints,
+    }
+
+
+def generator_options():
+    """ Deployment-wide generator settings that change the result of a run. """
+    return {
+        'islands': getattr(settings, 'GENERATION_ISLANDS', 1),
+        'refinement_seconds': getattr(settings, 'GENERATION_REFINEMENT_SECONDS', 0),
+    }
+
+
+def result_parameters(parameters):
+    """ The job parameters that can change the result; run-only ones (RUN_ONLY_PARAMETERS) are left out. """
+    return {key: value for key, value in parameters.items() if key not in RUN_ONLY_PARAMETERS}
+
+
+def enqueue_generation(parameters=None):
+    """
+    Creates a generation job. If a result for the same school data, parameters
+    and options is cached, the job is completed on the spot; otherwise it is
+    left pending for a worker. Profiled jobs always run.
+    """
+    parameters = parameters or {}
+    key = fingerprint(load_school_data(), result_parameters(parameters), generator_options())
+    cached = None if parameters.get('profiler') else get_cached_result(key)
+    if cached is None:
+        return GenerationJob.objects.create(parameters=parameters, fingerprint=key)
+    now = timezone.now()
+    return GenerationJob.objects.create(
+        parameters=parameters, fingerprint=key, status=GenerationJob.STATUS_COMPLETE, from_cache=True,
+        current_generation=cached.get('stats', {}).get('generations', 0),
+        best_fitness=cached.get('stats', {}).get('best_fitness'),
+        result=cached, started_at=now, finished_at=now,
+    )
+
+
+def stored_settings():
+    """ GA settings saved through /api/settings/, as {key: value}. """
+    return dict(AlgorithmSettings.objects.values_list('key', 'value'))
+
+
+def build_parameters(settings, n_requirements):
+    """
+    GAParameters and generation limit (None = the budget's default) from a
+    job's 'settings': the 'auto' profile's values for `n_requirements` lesson
+    periods, or the defaults, with explicit settings applied on top.
+    """
+    settings = dict(settings or {})
+    profile = settings.pop('profile', None)
+    max_generations = settings.pop('max_generations', None)
+    if profile == 'auto':
+        parameters, auto_generations = auto_parameters(n_requirements)
+        max_generations = max_generations or auto_generations
+    else:
+        parameters = GAParameters()
+    return dataclasses.replace(parameters, **settings), max_generations
+
+
+def build_budget(options, max_generations=None):
+    """
+    SearchBudget from a job's 'budget' parameters: a named profile plus
+    explicit overrides. Without a profile, `max_generations` (from the GA
+    settings) replaces the default generation limit.
+    """
+    options = dict(options or {})
+    profile = options.pop('profile', None)
+    base = BUDGET_PROFILES[profile] if profile else SearchBudget(max_generations=max_generations or MAX_GENERATIONS)
+    return dataclasses.replace(base, **options)
+
+
+def claim_next_job():
+    """
+    Atomically moves the oldest pending job to RUNNING and returns it,
+    or returns None when the queue is empty. The conditional UPDATE means
+    two workers can never claim the same job.
+    """
+    while True:
+        job = GenerationJob.objects.filter(status=GenerationJob.STATUS_PENDING).order_by('created_at').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = GenerationJob.objects.filter(pk=job.pk, status=GenerationJob.STATUS_PENDING).update(
+            status=GenerationJob.STATUS_RUNNING, started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def recover_stale_jobs():
+    """
+    Requeues RUNNING jobs whose worker stopped sending heartbeats, or fails
+    them if they have already been claimed GENERATION_JOB_MAX_ATTEMPTS times
+    (the job itself may be what kills its workers). Returns the counts
+    (requeued, failed).
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'GENERATION_JOB_STALE_SECONDS', 300))
+    stale = GenerationJob.objects.filter(status=GenerationJob.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    max_attempts = getattr(settings, 'GENERATION_JOB_MAX_ATTEMPTS', 2)
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=GenerationJob.STATUS_FAILED, finished_at=now,
+        error=f"The worker running the job stopped responding ({max_attempts} attempt(s)).",
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(
+        status=GenerationJob.STATUS_PENDING, started_at=None, heartbeat_at=None, current_generation=0, best_fitness=None,
+    )
+    if requeued or failed:
+        logger.warning("Recovered stale generation jobs: %d requeued, %d failed", requeued, failed)
+    return requeued, failed
+
+
+@contextmanager
+def heartbeat(job, interval=HEARTBEAT_INTERVAL):
+    """
+    Yields a start() that makes a background thread touch the job's
+    heartbeat_at every `interval` seconds until the block ends. run_job has
+    the generator call it once its pool or island processes are forked: a
+    fork while this thread holds a lock (logging, the database driver) can
+    deadlock the child.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    GenerationJob.objects.filter(pk=job.pk, status=GenerationJob.STATUS_RUNNING).update(
+                        heartbeat_at=timezone.now()
+                    )
+                except Exception:
+                    logger.exception("Heartbeat of generation job %s failed", job.pk)
+        finally:
+            # The thread's own database connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"job-{job.pk}-heartbeat", daemon=True)
+
+    def start():
+        if thread.ident is None:
+            thread.start()
+
+    try:
+        yield start
+    finally:
+        stop.set()
+        if thread.ident is not None:
+            thread.join()
+
+
+def run_job(job):
+    """ Runs the GA for a claimed job and stores the outcome on it. """
+    last_update = [0.0]
+
+    def report_progress(generation, best_score):
+        job.current_generation, job.best_fitness = generation, best_score
+        now = time.monotonic()
+        if now - last_update[0] < PROGRESS_UPDATE_INTERVAL:
+            return
+        last_update[0] = now
+        GenerationJob.objects.filter(pk=job.pk).update(current_generation=generation, best_fitness=best_score)
+
+    try:
+        school_data = load_school_data()
+        options = generator_options()
+        # Keyed on the data actually used, which may have changed since the job was queued
+        job.fingerprint = fingerprint(school_data, result_parameters(job.parameters), options)
+        parameters, max_generations = build_parameters(
+            job.parameters.get('settings'), sum(lesson['periods_per_week'] for lesson in school_data['lessons'])
+        )
+        grid = SlotGrid.from_timeslots(school_data['timeslots'])
+        warm_start = None
+        if job.parameters.get('warm_start_timetable'):
+            # Placed by day and period, in case the TimeSlot rows changed since
+            warm_start = warm_start_assignments(job.parameters['warm_start_timetable'], grid)
+        generator = TimetableGenerator(
+            school_data,
+            workers=getattr(settings, 'GENERATION_FITNESS_WORKERS', 1),
+            refinement_seconds=options['refinement_seconds'],
+            warm_start=warm_start,
+            seed=job.parameters.get('seed'),
+            parameters=parameters,
+            grid=grid,
+        )
+        budget = build_budget(job.parameters.get('budget'), max_generations)
+        islands = options['islands']
+        profile = {}
+        with heartbeat(job) as start_heartbeat, profiling(job.parameters.get('profiler'), profile):
+            if islands > 1:
+                result = generator.run_island_generation(
+                    islands, progress_callback=report_progress, budget=budget, on_started=start_heartbeat,
+                )
+            else:
+                result = generator.run_generation(
+                    progress_callback=report_progress, budget=budget, on_started=start_heartbeat,
+                )
+        job.telemetry = {**generator.telemetry.as_dict(), **profile}
+        if result.get('status') == 'error':
+            job.result = result
+            job.status = GenerationJob.STATUS_FAILED
+            job.error = result.get('message', '')
+        else:
+            timetable = save_timetable(generator, generator.best_genome, job=job, fingerprint=job.fingerprint)
+            # Cached copies of the result point at the same stored timetable
+            result['timetable_id'] = timetable.pk
+            job.result = result
+            job.status = GenerationJob.STATUS_COMPLETE
+    except Exception as e:
+        logger.exception("Generation job %s failed", job.pk)
+        job.status = GenerationJob.STATUS_FAILED
+        job.error = str(e)
+    else:
+        if job.status == GenerationJob.STATUS_COMPLETE:
+            try:
+                store_result(job.fingerprint, job.result)
+            except Exception:
+                # The job is still complete; the next identical request just runs again
+                logger.exception("Could not cache the result of generation job %s", job.pk)
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def run_worker(poll_interval=2.0, once=False):
+    """
+    Processes jobs forever (or until the queue is empty when `once` is set).
+    An error escaping a job fails that job only; the worker moves on.
+    """
+    while True:
+        recover_stale_jobs()
+        job = claim_next_job()
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        logger.info("Running generation job %s", job.pk)
+        try:
+            run_job(job)
+        except Exception as e:
+            logger.exception("Generation job %s crashed", job.pk)
+            job.status = GenerationJob.STATUS_FAILED
+            GenerationJob.objects.filter(pk=job.pk).update(
+                status=GenerationJob.STATUS_FAILED, error=str(e), finished_at=timezone.now()
+            )
+        logger.info("Generation job %s finished: %s", job.pk, job.status)
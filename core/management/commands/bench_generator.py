@@ -0,0 +1,70 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import (
+    BENCH_SCENARIOS, BENCH_GENERATIONS, BENCH_REPEAT, OPERATOR_REPEATS, run_benchmarks, compare_reports,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks TimetableGenerator on seeded synthetic schools, end to end and per operator, "
+        "and writes the report as JSON. With --compare, fails if a metric regressed against an earlier report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', choices=sorted(BENCH_SCENARIOS), default=list(BENCH_SCENARIOS))
+        parser.add_argument('--generations', type=int, default=BENCH_GENERATIONS)
+        parser.add_argument('--repeats', type=int, default=OPERATOR_REPEATS, help="Calls per operator timing.")
+        parser.add_argument(
+            '--repeat', type=int, default=BENCH_REPEAT,
+            help="Times each timing is taken; the fastest is reported and compared.",
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--groups', type=int, help="Override the number of groups of every scenario.")
+        parser.add_argument('--subjects', type=int, help="Override lessons per group.")
+        parser.add_argument('--teachers', type=int)
+        parser.add_argument('--periods', type=int, help="Override periods per week for every group.")
+        parser.add_argument('--constraint-density', type=float)
+        parser.add_argument('--no-memory', action='store_true', help="Skip the traced run that measures peak memory.")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+        parser.add_argument('--compare', help="Earlier JSON report to compare against.")
+        parser.add_argument('--tolerance', type=float, default=0.1, help="Allowed slowdown as a fraction (0.1 = 10%%).")
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        overrides = {
+            key: options[option] for key, option in (
+                ('groups', 'groups'), ('subjects', 'subjects'), ('teachers', 'teachers'),
+                ('periods_per_week', 'periods'), ('constraint_density', 'constraint_density'),
+            ) if options[option] is not None
+        }
+        report = run_benchmarks(
+            options['scenarios'], generations=options['generations'], repeats=options['repeats'],
+            seed=options['seed'], memory=not options['no_memory'], overrides=overrides, repeat=options['repeat'],
+        )
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(text + '\n')
+        else:
+            self.stdout.write(text)
+
+        for name, results in report['scenarios'].items():
+            end_to_end = results['end_to_end']
+            self.stderr.write(
+                f"{name}: {end_to_end['wall_seconds']:.2f}s (fastest of {options['repeat']}), "
+                f"{end_to_end['evaluations_per_second']:.0f} evals/sec, "
+                f"hard={end_to_end['hard_violations']} soft={end_to_end['soft_penalty']}"
+            )
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = compare_reports(baseline, report, options['tolerance'])
+            for scenario, metric, old, new in regressions:
+                self.stderr.write(f"REGRESSION {scenario} {metric}: {old} -> {new}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} metric(s) regressed by more than {options['tolerance']:.0%}.")
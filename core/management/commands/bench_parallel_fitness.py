@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import synthetic_school_data
+from core.generator import TimetableGenerator, ParallelEvaluator
+
+
+class Command(BaseCommand):
+    help = "Measures GA generations/sec with fitness evaluation spread over 1, 2, 4 and 8 processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+        parser.add_argument('--generations', type=int, default=30)
+        parser.add_argument('--groups', type=int, default=40)
+        parser.add_argument('--periods', type=int, default=40, help="Periods per week for every group.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        school_data = synthetic_school_data(
+            groups=options['groups'], periods_per_week=options['periods'], seed=options['seed']
+        )
+        generator = TimetableGenerator(school_data)
+        self.stdout.write(
+            f"{len(generator.lesson_requirements)} lesson requirements, "
+            f"{len(generator.teachers)} teachers, {options['generations']} generations per run"
+        )
+        baseline = None
+        for workers in options['workers']:
+            rate = self.measure(generator, workers, options['generations'])
+            baseline = baseline or rate
+            self.stdout.write(f"{workers:>3} worker(s): {rate:8.2f} generations/sec  (x{rate / baseline:.2f})")
+
+    def measure(self, generator, workers, generations):
+        generator.evaluator = ParallelEvaluator(generator.fitness_engine, workers) if workers > 1 else None
+        try:
+            population = generator.generate_initial_population()
+            # One untimed generation so pool start-up is not counted
+            generator.calculate_population_fitness(population)
+            start = time.perf_counter()
+            for _ in range(generations):
+                scores = generator.calculate_population_fitness(population)
+                population = generator.breed(sorted(zip(scores.tolist(), population), key=lambda x: x[0]))
+            generator.calculate_population_fitness(population)
+            return generations / (time.perf_counter() - start)
+        finally:
+            if generator.evaluator:
+                generator.evaluator.close()
+                generator.evaluator = None
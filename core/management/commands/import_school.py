@@ -0,0 +1,38 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import import_school
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports teachers, subjects, student groups and lessons from an .xlsx workbook "
+        "(one sheet per table) and/or CSV files named after their table (teachers.csv, ...)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+')
+        parser.add_argument('--json', action='store_true', help="Print the full summary as JSON.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        files = []
+        try:
+            for path in options['paths']:
+                files.append((path, open(path, 'rb')))
+            summary = import_school(files)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            for _, file in files:
+                file.close()
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2, default=str))
+            return
+        for table, counts in summary.items():
+            self.stdout.write(f"{table}: {counts['created']} created, {len(counts['rejected'])} rejected")
+            for rejected in counts['rejected'][:20]:
+                self.stdout.write(f"  {rejected['source']} row {rejected['row']}: {json.dumps(rejected['errors'])}")
+        self.stdout.write(f"Done in {time.perf_counter() - started:.2f}s")
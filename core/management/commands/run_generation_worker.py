@@ -0,0 +1,54 @@
+import multiprocessing
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker_process(poll_interval, once):
+    # Needed when the process was spawned rather than forked (e.g. on Windows)
+    django.setup()
+    from core.jobs import run_worker
+    run_worker(poll_interval=poll_interval, once=once)
+
+
+class Command(BaseCommand):
+    help = "Runs background timetable generation jobs queued by POST /api/generate/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=getattr(settings, 'GENERATION_WORKER_PROCESSES', 1),
+            help="Number of worker processes; each runs one generation job at a time.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help="Seconds to wait between checks of an empty queue.",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit as soon as the queue is empty instead of waiting for new jobs.",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        self.stdout.write(f"Starting {processes} generation worker process(es)...")
+        if processes == 1:
+            from core.jobs import run_worker
+            run_worker(poll_interval=options['poll_interval'], once=options['once'])
+            return
+
+        # Database connections must not be shared with the child processes
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=_worker_process, args=(options['poll_interval'], options['once']))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
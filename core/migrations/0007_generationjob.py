@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_rename_first_name_teacher_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETE', 'Complete'), ('FAILED', 'Failed')], db_index=True, default='PENDING', max_length=10)),
+                ('current_generation', models.PositiveIntegerField(default=0)),
+                ('best_fitness', models.IntegerField(blank=True, help_text='Best fitness found so far (0 = no clashes)', null=True)),
+                ('result', models.JSONField(blank=True, help_text="Final payload, including 'schedules'", null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
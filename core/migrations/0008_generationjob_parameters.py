@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_generationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='parameters',
+            field=models.JSONField(blank=True, default=dict, help_text="Run options, e.g. the search 'budget'"),
+        ),
+    ]
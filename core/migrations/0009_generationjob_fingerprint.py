@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_generationjob_parameters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of the school data and parameters', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='generationjob',
+            name='from_cache',
+            field=models.BooleanField(default=False, help_text='Result served from the generation result cache'),
+        ),
+    ]
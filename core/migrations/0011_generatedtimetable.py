@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_generationjob_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneratedTimetable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(blank=True, default='', help_text='Hash of the school data and parameters', max_length=64)),
+                ('best_fitness', models.IntegerField(default=0)),
+                ('days', models.JSONField(help_text="Day names of the slot grid, e.g. ['Monday', ...]")),
+                ('periods_in_day', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='timetables', to='core.generationjob')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduledLesson',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(help_text="Index of the lesson period in the run; the 'id' the frontend sees")),
+                ('slot', models.PositiveIntegerField(help_text='day * periods_in_day + period (both 0-based)')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.lesson')),
+                ('student_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.studentgroup')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.teacher')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scheduled_lessons', to='core.generatedtimetable')),
+            ],
+            options={
+                'ordering': ['timetable', 'position'],
+                'indexes': [models.Index(fields=['timetable', 'slot'], name='core_schedu_timetab_52d9cc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('timetable', 'position'), name='unique_timetable_position')],
+            },
+        ),
+    ]
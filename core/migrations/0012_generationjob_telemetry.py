@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_generatedtimetable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='telemetry',
+            field=models.JSONField(blank=True, help_text='Per-generation metrics, phase timings and (if requested) the profile', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_generationjob_telemetry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlgorithmSettings',
+            fields=[
+                ('key', models.CharField(help_text="e.g. 'population_size', 'profile'", max_length=100, primary_key=True, serialize=False)),
+                ('value', models.JSONField()),
+            ],
+            options={
+                'verbose_name_plural': 'algorithm settings',
+            },
+        ),
+    ]
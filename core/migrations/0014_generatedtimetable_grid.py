@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_algorithmsettings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedtimetable',
+            name='grid',
+            field=models.JSONField(blank=True, help_text='Slot grid (core.slots.SlotGrid.as_dict); null: days x periods_in_day', null=True),
+        ),
+        migrations.AlterField(
+            model_name='scheduledlesson',
+            name='slot',
+            field=models.PositiveIntegerField(help_text="Index into the timetable's slot grid"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_generatedtimetable_grid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, help_text='Times a worker has claimed the job'),
+        ),
+        migrations.AddField(
+            model_name='generationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life from the worker running the job', null=True),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_names(apps, schema_editor):
+    """ Fills the name columns of existing rows from the rows they point at. """
+    ScheduledLesson = apps.get_model('core', 'ScheduledLesson')
+    Lesson = apps.get_model('core', 'Lesson')
+    StudentGroup = apps.get_model('core', 'StudentGroup')
+    Teacher = apps.get_model('core', 'Teacher')
+    ScheduledLesson.objects.update(
+        subject_name=Subquery(Lesson.objects.filter(pk=OuterRef('lesson_id')).values('subject__subject_name')[:1]),
+        group_name=Subquery(StudentGroup.objects.filter(pk=OuterRef('student_group_id')).values('group_name')[:1]),
+        teacher_name=Subquery(Teacher.objects.filter(pk=OuterRef('teacher_id')).values('name')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_generationjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduledlesson',
+            name='group_name',
+            field=models.CharField(blank=True, default='', help_text='As it was when generated', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='scheduledlesson',
+            name='subject_name',
+            field=models.CharField(blank=True, default='', help_text='As it was when generated', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='scheduledlesson',
+            name='teacher_name',
+            field=models.CharField(blank=True, default='', help_text='As it was when generated', max_length=100),
+        ),
+        migrations.RunPython(copy_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='scheduledlesson',
+            name='lesson',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.lesson'),
+        ),
+        migrations.AlterField(
+            model_name='scheduledlesson',
+            name='student_group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.studentgroup'),
+        ),
+        migrations.AlterField(
+            model_name='scheduledlesson',
+            name='teacher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.teacher'),
+        ),
+    ]
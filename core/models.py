@@ -76,4 +76,92 @@ class ConstraintParameter(models.Model):
     parameter_value = models.CharField(max_length=255)
 
     def __str__(self):
-        return f"{self.instance}: {self.parameter_key} = {self.parameter_value}"
\ No newline at end of file
+        return f"{self.instance}: {self.parameter_key} = {self.parameter_value}"
+
+# Stored GA settings (see core.generator.GAParameters), one row per setting; requests can override them
+class AlgorithmSettings(models.Model):
+    key = models.CharField(max_length=100, primary_key=True, help_text="e.g. 'population_size', 'profile'")
+    value = models.JSONField()
+
+    class Meta:
+        verbose_name_plural = 'algorithm settings'
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+# Background generation jobs, picked up by `manage.py run_generation_worker`
+class GenerationJob(models.Model):
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_COMPLETE = 'COMPLETE'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    parameters = models.JSONField(default=dict, blank=True, help_text="Run options, e.g. the search 'budget'")
+    fingerprint = models.CharField(max_length=64, blank=True, default='', help_text="Hash of the school data and parameters")
+    from_cache = models.BooleanField(default=False, help_text="Result served from the generation result cache")
+    current_generation = models.PositiveIntegerField(default=0)
+    best_fitness = models.IntegerField(blank=True, null=True, help_text="Best fitness found so far (0 = no clashes)")
+    result = models.JSONField(blank=True, null=True, help_text="Final payload, including 'schedules'")
+    error = models.TextField(blank=True, default='')
+    telemetry = models.JSONField(
+        blank=True, null=True, help_text="Per-generation metrics, phase timings and (if requested) the profile"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True, help_text="Last sign of life from the worker running the job")
+    attempts = models.PositiveIntegerField(default=0, help_text="Times a worker has claimed the job")
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Generation job {self.pk} ({self.status})"
+
+# A finished run's best timetable, one ScheduledLesson row per lesson period
+class GeneratedTimetable(models.Model):
+    job = models.ForeignKey(GenerationJob, on_delete=models.SET_NULL, blank=True, null=True, related_name='timetables')
+    fingerprint = models.CharField(max_length=64, blank=True, default='', help_text="Hash of the school data and parameters")
+    best_fitness = models.IntegerField(default=0)
+    days = models.JSONField(help_text="Day names of the slot grid, e.g. ['Monday', ...]")
+    periods_in_day = models.PositiveIntegerField()
+    grid = models.JSONField(
+        blank=True, null=True, help_text="Slot grid (core.slots.SlotGrid.as_dict); null: days x periods_in_day"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Timetable {self.pk} (fitness {self.best_fitness})"
+
+class ScheduledLesson(models.Model):
+    timetable = models.ForeignKey(GeneratedTimetable, on_delete=models.CASCADE, related_name='scheduled_lessons')
+    position = models.PositiveIntegerField(help_text="Index of the lesson period in the run; the 'id' the frontend sees")
+    # Deleting a lesson, group or teacher leaves the row in place; the names below still show what was scheduled
+    lesson = models.ForeignKey(Lesson, on_delete=models.SET_NULL, blank=True, null=True)
+    student_group = models.ForeignKey(StudentGroup, on_delete=models.SET_NULL, blank=True, null=True)
+    teacher = models.ForeignKey(Teacher, on_delete=models.SET_NULL, blank=True, null=True)
+    slot = models.PositiveIntegerField(help_text="Index into the timetable's slot grid")
+    subject_name = models.CharField(max_length=100, blank=True, default='', help_text="As it was when generated")
+    group_name = models.CharField(max_length=100, blank=True, default='', help_text="As it was when generated")
+    teacher_name = models.CharField(max_length=100, blank=True, default='', help_text="As it was when generated")
+
+    class Meta:
+        ordering = ['timetable', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['timetable', 'position'], name='unique_timetable_position'),
+        ]
+        indexes = [
+            models.Index(fields=['timetable', 'slot']),
+        ]
+
+    def __str__(self):
+        return f"{self.lesson} in slot {self.slot}"
@@ -0,0 +1,20 @@
+# core/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the CRUD list endpoints. It is only applied when
+    the client asks for it with ?page_size= (or follows a ?cursor= link),
+    so clients that expect a plain list keep getting one.
+    """
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
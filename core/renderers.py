@@ -0,0 +1,13 @@
+# core/renderers.py
+from rest_framework.renderers import JSONRenderer
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    Selected with ?format=compact or `Accept: application/vnd.timetable.compact+json`.
+    Views check `request.accepted_renderer.format == 'compact'` and return the
+    dictionary-encoded timetable (see core.timetables.compact_timetable)
+    instead of the verbose schedules.
+    """
+    media_type = 'application/vnd.timetable.compact+json'
+    format = 'compact'
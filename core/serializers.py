@@ -1,5 +1,11 @@
 # core/serializers.py
+from django.db.models import Sum
 from rest_framework import serializers
+from .generator import (
+    BUDGET_PROFILES, FRONTEND_VIEWS, PARAMETER_PROFILES, POPULATION_SIZE, SearchBudget, auto_parameters,
+)
+from .renderers import CompactJSONRenderer
+from .timetables import load_timetable, compact_timetable
 from .models import (
     Teacher,
     Subject,
@@ -8,23 +14,111 @@ from .models import (
     Lesson,
     ConstraintType,
     ConstraintInstance,
-    ConstraintParameter
+    ConstraintParameter,
+    GenerationJob,
+    AlgorithmSettings,
 )
 
+# --- Bulk support ---
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Inside a bulk request (a 'preloaded' dict in the context) ids are looked up
+    in one in_bulk() query per related model instead of one query per row.
+    """
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded')
+        if preloaded is None:
+            return super().to_internal_value(data)
+        queryset = self.get_queryset()
+        if queryset.model not in preloaded:
+            preloaded[queryset.model] = queryset.in_bulk()
+        try:
+            return preloaded[queryset.model][int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    many=True serializer that saves with bulk_create / bulk_update (plus one
+    bulk insert per many-to-many field). Bulk writes send no model signals,
+    so callers must clear the generation result cache themselves.
+    For updates, `instance` is the list of objects and every item carries its "id".
+    """
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        if not hasattr(self, '_instances'):
+            self._instances = {str(obj.pk): obj for obj in self.instance}
+            self._updated = []
+        obj = self._instances.get(str(data.get('id'))) if isinstance(data, dict) else None
+        if obj is None:
+            raise serializers.ValidationError({'id': "Unknown or missing id."})
+        self.child.instance, self.child.initial_data = obj, data
+        validated = super().run_child_validation(data)
+        self._updated.append(obj)
+        return validated
+
+    def _split_many_to_many(self, validated_data):
+        names = [field.name for field in self.child.Meta.model._meta.many_to_many]
+        return [{name: attrs.pop(name) for name in names if name in attrs} for attrs in validated_data]
+
+    def _add_many_to_many(self, objects, related):
+        model = self.child.Meta.model
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source, target = f"{field.m2m_field_name()}_id", f"{field.m2m_reverse_field_name()}_id"
+            through.objects.bulk_create([
+                through(**{source: obj.pk, target: pk})
+                for obj, values in zip(objects, related)
+                for pk in dict.fromkeys(value.pk for value in values.get(field.name, ()))
+            ])
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        related = self._split_many_to_many(validated_data)
+        objects = model.objects.bulk_create([model(**attrs) for attrs in validated_data])
+        self._add_many_to_many(objects, related)
+        return objects
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        objects = self._updated  # In the order of validated_data
+        related = self._split_many_to_many(validated_data)
+        fields = set()
+        for obj, attrs in zip(objects, validated_data):
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+            fields.update(attrs)
+        if fields:
+            model.objects.bulk_update(objects, list(fields))
+        for field in model._meta.many_to_many:
+            changed = [obj for obj, values in zip(objects, related) if field.name in values]
+            if changed:
+                field.remote_field.through.objects.filter(**{f"{field.m2m_field_name()}__in": changed}).delete()
+        self._add_many_to_many(objects, related)
+        return objects
+
+
 class TeacherSerializer(serializers.ModelSerializer):
     class Meta:
         model = Teacher
+        list_serializer_class = BulkListSerializer
         fields = ['id', 'name', 'designation', 'max_periods_per_week']
 
 class SubjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subject
+        list_serializer_class = BulkListSerializer
         fields = '__all__'
 
 
 class StudentGroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentGroup
+        list_serializer_class = BulkListSerializer
         fields = '__all__'
 
 class TimeSlotSerializer(serializers.ModelSerializer):
@@ -33,8 +127,11 @@ class TimeSlotSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class LessonSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Lesson
+        list_serializer_class = BulkListSerializer
         fields = '__all__'
 
 class ConstraintTypeSerializer(serializers.ModelSerializer):
@@ -42,12 +139,178 @@ class ConstraintTypeSerializer(serializers.ModelSerializer):
         model = ConstraintType
         fields = '__all__'
 
+class ConstraintParameterSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
+    class Meta:
+        model = ConstraintParameter
+        list_serializer_class = BulkListSerializer
+        fields = '__all__'
+
 class ConstraintInstanceSerializer(serializers.ModelSerializer):
+    parameters = ConstraintParameterSerializer(many=True, read_only=True)
+
     class Meta:
         model = ConstraintInstance
         fields = '__all__'
 
-class ConstraintParameterSerializer(serializers.ModelSerializer):
+
+class SearchBudgetSerializer(serializers.Serializer):
+    """ Optional 'budget' of a generate request; explicit limits override the profile's. """
+    profile = serializers.ChoiceField(choices=list(BUDGET_PROFILES), required=False)
+    max_seconds = serializers.FloatField(min_value=0.1, required=False, allow_null=True)
+    max_generations = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    stagnation_generations = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    target_fitness = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, data):
+        # Stagnation alone can run for hours while the search keeps finding small improvements
+        base = BUDGET_PROFILES[data['profile']] if data.get('profile') else SearchBudget()
+        limits = [data.get(name, getattr(base, name)) for name in ('max_seconds', 'max_generations')]
+        if all(limit is None for limit in limits):
+            raise serializers.ValidationError("Set max_seconds or max_generations; the search needs a limit.")
+        return data
+
+
+class GASettingsSerializer(serializers.Serializer):
+    """
+    GA settings: the stored ones merged with a generate request's "settings"
+    overrides. "profile": "auto" scales population and generations with the
+    school; explicit values override the profile's.
+    """
+    profile = serializers.ChoiceField(choices=list(PARAMETER_PROFILES), required=False)
+    population_size = serializers.IntegerField(min_value=10, max_value=5000, required=False)
+    max_generations = serializers.IntegerField(min_value=1, required=False)
+    mutation_rate = serializers.FloatField(min_value=0, max_value=1, required=False)
+    elitism_count = serializers.IntegerField(min_value=0, required=False)
+    tournament_size = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        population_size = self.effective_population_size(data)
+        if data.get('elitism_count', 0) > population_size - 2:
+            raise serializers.ValidationError({
+                "elitism_count": f"Must leave at least two places for children (population size {population_size})."
+            })
+        return data
+
+    @staticmethod
+    def effective_population_size(data):
+        """
+        Population size a run with these settings uses: the explicit one, else
+        the 'auto' profile's for the current lessons, else the default.
+        """
+        if 'population_size' in data:
+            return data['population_size']
+        if data.get('profile') == 'auto':
+            n_requirements = Lesson.objects.aggregate(total=Sum('periods_per_week'))['total'] or 0
+            return auto_parameters(n_requirements)[0].population_size
+        return POPULATION_SIZE
+
+
+class AlgorithmSettingsSerializer(serializers.ModelSerializer):
+    """
+    One stored GA setting; the key must be a GASettingsSerializer field and
+    the value valid for it, and also together with the other stored settings.
+    """
     class Meta:
-        model = ConstraintParameter
-        fields = '__all__'
+        model = AlgorithmSettings
+        fields = ['key', 'value']
+
+    def validate(self, data):
+        field = GASettingsSerializer().fields.get(data['key'])
+        if field is None:
+            raise serializers.ValidationError({"key": f"Unknown setting; choose one of {', '.join(GASettingsSerializer().fields)}."})
+        try:
+            data['value'] = field.run_validation(data['value'])
+        except serializers.ValidationError as e:
+            raise serializers.ValidationError({"value": e.detail})
+        stored = dict(AlgorithmSettings.objects.exclude(pk=data['key']).values_list('key', 'value'))
+        combined = GASettingsSerializer(data={**stored, data['key']: data['value']})
+        if not combined.is_valid():
+            raise serializers.ValidationError({"value": combined.errors})
+        return data
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    message = serializers.SerializerMethodField()
+    stop_reason = serializers.SerializerMethodField()
+    stats = serializers.SerializerMethodField()
+    schedules = serializers.SerializerMethodField()
+    teacher_schedules = serializers.SerializerMethodField()
+    slot_matrix = serializers.SerializerMethodField()
+    timetable_id = serializers.SerializerMethodField()
+    seed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = GenerationJob
+        fields = [
+            'id', 'status', 'parameters', 'from_cache', 'current_generation', 'best_fitness', 'message',
+            'stop_reason', 'seed', 'stats', 'schedules', 'teacher_schedules', 'slot_matrix', 'timetable_id', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
+
+    def get_message(self, obj):
+        return (obj.result or {}).get('message')
+
+    def get_stop_reason(self, obj):
+        return (obj.result or {}).get('stop_reason')
+
+    def get_seed(self, obj):
+        return (obj.result or {}).get('seed')
+
+    def get_stats(self, obj):
+        return (obj.result or {}).get('stats')
+
+    def get_schedules(self, obj):
+        return (obj.result or {}).get('schedules')
+
+    def get_teacher_schedules(self, obj):
+        return (obj.result or {}).get('teacher_schedules')
+
+    def get_slot_matrix(self, obj):
+        return (obj.result or {}).get('slot_matrix')
+
+    def get_timetable_id(self, obj):
+        return (obj.result or {}).get('timetable_id')
+
+    def to_representation(self, obj):
+        """
+        Leaves out the timetable views not listed in the 'views' context entry
+        (default: DEFAULT_VIEWS). With 'compact' in the context, the views are
+        replaced by the dictionary-encoded stored timetable.
+        """
+        data = super().to_representation(obj)
+        views = () if self.context.get('compact') else self.context.get('views', DEFAULT_VIEWS)
+        for view in FRONTEND_VIEWS:
+            if view not in views:
+                del data[view]
+        if self.context.get('compact'):
+            timetable = load_timetable(data['timetable_id']) if data['timetable_id'] else None
+            data['timetable'] = compact_timetable(timetable) if timetable else None
+        return data
+
+
+# Views returned when a request does not ask for any; the others are opt-in through ?views=
+DEFAULT_VIEWS = ('schedules',)
+
+
+def job_context(request):
+    """ Serializer context for GenerationJobSerializer from the request's ?views= and format. """
+    return {
+        'views': requested_views(request),
+        'compact': request.accepted_renderer.format == CompactJSONRenderer.format,
+    }
+
+
+def requested_views(request):
+    """
+    Timetable views asked for with ?views=schedules,teacher_schedules,slot_matrix,
+    or DEFAULT_VIEWS without the parameter. Raises ValidationError for unknown names.
+    """
+    value = request.query_params.get('views')
+    if value is None:
+        return DEFAULT_VIEWS
+    views = [view for view in value.split(',') if view]
+    unknown = sorted(set(views) - set(FRONTEND_VIEWS))
+    if unknown:
+        raise serializers.ValidationError({"views": f"Unknown view(s): {', '.join(unknown)}."})
+    return views
@@ -0,0 +1,21 @@
+# core/signals.py
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from .cache import clear_results
+from .models import (
+    Teacher, Subject, StudentGroup, TimeSlot, Lesson,
+    ConstraintType, ConstraintInstance, ConstraintParameter
+)
+
+# Models whose rows feed the generator; see core.jobs.load_school_data
+SCHOOL_DATA_MODELS = [
+    Teacher, Subject, StudentGroup, TimeSlot, Lesson,
+    ConstraintType, ConstraintInstance, ConstraintParameter,
+]
+
+
+def connect_signals():
+    for model in SCHOOL_DATA_MODELS:
+        post_save.connect(clear_results, sender=model, dispatch_uid=f'clear_results_save_{model.__name__}')
+        post_delete.connect(clear_results, sender=model, dispatch_uid=f'clear_results_delete_{model.__name__}')
+    m2m_changed.connect(clear_results, sender=Lesson.teachers.through, dispatch_uid='clear_results_lesson_teachers')
@@ -0,0 +1,107 @@
+# core/slots.py
+"""
+The weekly slot grid.
+
+Slots are integer indexes 0..n_slots-1 over the school's TimeSlot rows,
+sorted by day and start time. Each slot sits at a (day, period) cell of
+the days x periods matrix the frontend shows, where period n is the n-th
+TimeSlot of that day; days may have different numbers of periods. Without
+TimeSlot rows the grid is DEFAULT_DAYS x DEFAULT_PERIODS_IN_DAY, whose slot
+indexes are day * periods_in_day + period.
+
+Adjacency is precomputed as arrays and boolean matrices so constraints
+(consecutive-period and daily limits) can test two slots in O(1).
+"""
+from collections import defaultdict
+
+import numpy as np
+
+# Index = TimeSlot.day_of_week
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DEFAULT_DAYS = DAY_NAMES[:6]
+DEFAULT_PERIODS_IN_DAY = 8
+
+
+class SlotGrid:
+    """
+    `days` are the day names in order; `cells` gives each slot's (day index,
+    period index); `timeslot_ids` the TimeSlot row of each slot, if any.
+
+    - slot_day[s], slot_period[s]: the cell of slot s
+    - next_slot[s], prev_slot[s]: the following / preceding period of the same day, or -1
+    - same_day[a, b], consecutive[a, b]: boolean n_slots x n_slots tables
+    - day_slots[d]: the slots of day d in period order
+    """
+    def __init__(self, days, cells, timeslot_ids=None):
+        self.days = list(days)
+        self.cells = [tuple(cell) for cell in cells]
+        self.n_slots = len(self.cells)
+        self.timeslot_ids = list(timeslot_ids) if timeslot_ids else [None] * self.n_slots
+        self.periods_in_day = max((period for _, period in self.cells), default=-1) + 1
+        self.index = {cell: slot for slot, cell in enumerate(self.cells)}
+        self.timeslot_slot = {pk: slot for slot, pk in enumerate(self.timeslot_ids) if pk is not None}
+
+        self.slot_day = np.array([day for day, _ in self.cells], dtype=np.int64)
+        self.slot_period = np.array([period for _, period in self.cells], dtype=np.int64)
+        self.day_slots = [[] for _ in self.days]
+        for slot, (day, _) in enumerate(self.cells):
+            self.day_slots[day].append(slot)
+        self.next_slot = np.full(self.n_slots, -1, dtype=np.int64)
+        self.prev_slot = np.full(self.n_slots, -1, dtype=np.int64)
+        for slots in self.day_slots:
+            for a, b in zip(slots, slots[1:]):
+                if self.cells[b][1] == self.cells[a][1] + 1:
+                    self.next_slot[a], self.prev_slot[b] = b, a
+        self.same_day = self.slot_day[:, None] == self.slot_day[None, :]
+        self.consecutive = np.zeros((self.n_slots, self.n_slots), dtype=bool)
+        linked = np.flatnonzero(self.next_slot >= 0)
+        self.consecutive[linked, self.next_slot[linked]] = True
+        self.consecutive[self.next_slot[linked], linked] = True
+
+    @classmethod
+    def rectangular(cls, days=DEFAULT_DAYS, periods_in_day=DEFAULT_PERIODS_IN_DAY):
+        """ Every day has `periods_in_day` periods; slot = day * periods_in_day + period. """
+        return cls(days, [(day, period) for day in range(len(days)) for period in range(periods_in_day)])
+
+    @classmethod
+    def from_timeslots(cls, rows):
+        """ Grid of TimeSlot rows (dicts with id, day_of_week, start_time); the default grid if there are none. """
+        if not rows:
+            return cls.rectangular()
+        by_day = defaultdict(list)
+        for row in rows:
+            by_day[row['day_of_week']].append(row)
+        days, cells, timeslot_ids = [], [], []
+        for day_of_week in sorted(by_day):
+            for period, row in enumerate(sorted(by_day[day_of_week], key=lambda r: (r['start_time'], r['id']))):
+                cells.append((len(days), period))
+                timeslot_ids.append(row['id'])
+            days.append(DAY_NAMES[day_of_week])
+        return cls(days, cells, timeslot_ids)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['days'], data['cells'], data.get('timeslot_ids'))
+
+    def as_dict(self):
+        """ JSON form, stored with each generated timetable. """
+        return {"days": self.days, "cells": [list(cell) for cell in self.cells], "timeslot_ids": self.timeslot_ids}
+
+    def period_labels(self):
+        return [f"Period {i}" for i in range(1, self.periods_in_day + 1)]
+
+    def slot(self, day, period):
+        """ The slot at day index `day`, period index `period` (both 0-based), or None. """
+        return self.index.get((day, period))
+
+    def slot_for_labels(self, day_name, period_label):
+        """ The slot shown as (`day_name`, `period_label`), e.g. ("Monday", "Period 3"), or None. """
+        labels = self.period_labels()
+        if day_name not in self.days or period_label not in labels:
+            return None
+        return self.slot(self.days.index(day_name), labels.index(period_label))
+
+    def labels(self, slot):
+        """ (day name, period label) of a slot. """
+        day, period = self.cells[slot]
+        return self.days[day], f"Period {period + 1}"
@@ -0,0 +1,151 @@
+# core/telemetry.py
+"""
+Instrumentation of generation runs.
+
+GenerationTelemetry records, per generation, the best, mean and worst
+fitness, the population's diversity, the genomes evaluated and the time
+taken, plus the total time spent in each phase of the GA (fitness,
+selection, crossover, mutation, formatting, ...). Long runs keep at most
+TELEMETRY_MAX_GENERATIONS of them (every 2nd, 4th, ... generation, plus
+the last); every generation is still logged at DEBUG level on the
+'core.telemetry' logger.
+
+profiling() optionally wraps a run in cProfile or pyinstrument (if
+installed) and keeps the text report.
+"""
+import cProfile
+import importlib.util
+import io
+import logging
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ('cprofile', 'pyinstrument')
+PROFILE_TOP_FUNCTIONS = 40
+# Generations kept in the stored series; past this the series is thinned to every other kept generation
+TELEMETRY_MAX_GENERATIONS = 250
+
+
+class GenerationTelemetry:
+    """ Per-generation metrics and phase timings of one run. """
+    def __init__(self):
+        self.generations = []
+        self.generation_stride = 1
+        # The latest generation when the stride skipped it: (entry, scores, population)
+        self._latest = None
+        self.phase_seconds = defaultdict(float)
+        self.islands = []
+        self.evaluations = 0
+        self.started = self._last_time = time.perf_counter()
+        self._last_evaluations = 0
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] += time.perf_counter() - started
+
+    def record_generation(self, generation, scores, population, evaluations):
+        """
+        `scores` are the fitness values of `population`; `evaluations` is the
+        run's running total of genomes scored. Only generations that are kept
+        or logged pay for the diversity, which stacks the whole population.
+        """
+        now = time.perf_counter()
+        entry = {
+            "generation": generation,
+            "best": int(scores.min()),
+            "mean": round(float(scores.mean()), 1),
+            "worst": int(scores.max()),
+            "evaluations": evaluations - self._last_evaluations,
+            "seconds": round(now - self._last_time, 4),
+        }
+        self.evaluations = evaluations
+        self._last_time, self._last_evaluations = now, evaluations
+        kept = generation % self.generation_stride == 0
+        if kept or logger.isEnabledFor(logging.DEBUG):
+            entry["diversity"] = diversity(scores, population)
+            logger.debug(
+                "generation=%(generation)d best=%(best)d mean=%(mean).1f worst=%(worst)d "
+                "diversity=%(diversity).4f evaluations=%(evaluations)d seconds=%(seconds).4f", entry
+            )
+        if not kept:
+            self._latest = (entry, scores, population)
+            return
+        self._latest = None
+        self.generations.append(entry)
+        if len(self.generations) > TELEMETRY_MAX_GENERATIONS:
+            self.generation_stride *= 2
+            self.generations = [e for e in self.generations if e["generation"] % self.generation_stride == 0]
+
+    def generation_series(self):
+        """ The kept generations, ending with the latest one even if the stride skipped it. """
+        if self._latest is None:
+            return self.generations
+        entry, scores, population = self._latest
+        if "diversity" not in entry:
+            entry["diversity"] = diversity(scores, population)
+        return self.generations + [entry]
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.started
+        fitness_seconds = self.phase_seconds.get('fitness', 0)
+        data = {
+            "generations": self.generation_series(),
+            "generation_stride": self.generation_stride,
+            "phase_seconds": {name: round(seconds, 4) for name, seconds in self.phase_seconds.items()},
+            "evaluations": self.evaluations,
+            "evaluations_per_second": round(self.evaluations / elapsed, 1) if elapsed else None,
+            "fitness_evaluations_per_second": round(self.evaluations / fitness_seconds, 1) if fitness_seconds else None,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+        if self.islands:
+            data["islands"] = self.islands
+        return data
+
+
+def diversity(scores, population):
+    """ Mean share of genes (slots) in which a genome differs from the best one of `population`. """
+    best = population[int(scores.argmin())]
+    return round(float((np.stack([genome.slots for genome in population]) != best.slots).mean()), 4)
+
+
+def profiler_available(kind):
+    if kind == 'pyinstrument':
+        return importlib.util.find_spec('pyinstrument') is not None
+    return kind in PROFILERS
+
+
+@contextmanager
+def profiling(kind, report):
+    """ Profiles the block with `kind` (see PROFILERS, or None for no profiling) and stores the text in report['profile']. """
+    if not kind:
+        yield
+        return
+    if kind == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            report['profile'] = profiler.output_text()
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        report['profile'] = out.getvalue()
@@ -0,0 +1,29 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import validation
+from core.cache import result_cache
+from core.models import Teacher, Subject, StudentGroup, TimeSlot, Lesson
+
+
+class SchoolDataTestCase(TestCase):
+    """ Two groups sharing one teacher, on a Monday-Tuesday grid of three periods a day. """
+    def setUp(self):
+        cache.clear()
+        result_cache().clear()
+        validation._validators.clear()
+        self.client = APIClient()
+        self.teacher = Teacher.objects.create(name='Asha', designation='TGT', max_periods_per_week=20)
+        self.subject = Subject.objects.create(subject_name='Maths')
+        self.groups = [StudentGroup.objects.create(group_name=f'Grade 9{c}', grade_level='9') for c in 'AB']
+        self.lessons = []
+        for group in self.groups:
+            lesson = Lesson.objects.create(subject=self.subject, student_group=group, periods_per_week=1)
+            lesson.teachers.add(self.teacher)
+            self.lessons.append(lesson)
+        for day in range(2):
+            for hour in range(8, 11):
+                TimeSlot.objects.create(day_of_week=day, start_time=time(hour), end_time=time(hour, 45))
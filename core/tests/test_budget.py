@@ -0,0 +1,46 @@
+from time import monotonic
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.benchmarks import synthetic_school_data
+from core.generator import GAParameters, SearchBudget, TimetableGenerator
+from core.serializers import SearchBudgetSerializer
+
+
+class TimeBudgetTests(TestCase):
+    def setUp(self):
+        self.generator = TimetableGenerator(
+            synthetic_school_data(groups=4, seed=6), seed=6, random_share=0, parameters=GAParameters(population_size=20),
+        )
+
+    def test_seeding_fills_at_random_past_its_deadline(self):
+        with mock.patch.object(self.generator, 'greedy_individual') as greedy:
+            population = self.generator.generate_initial_population(deadline=monotonic())
+        self.assertEqual(len(population), 20)
+        greedy.assert_not_called()
+
+    def test_refinement_capped_by_remaining_time(self):
+        self.assertEqual(SearchBudget(max_seconds=2).remaining(1.5, 10), 0.5)
+        self.assertEqual(SearchBudget(max_seconds=2).remaining(3, 10), 0)
+        self.assertEqual(SearchBudget().remaining(3, 10), 10)
+
+
+class BudgetRequestTests(TestCase):
+    def test_budget_without_a_limit_is_rejected(self):
+        client = APIClient()
+        for budget in (
+            {"max_generations": None},
+            {"profile": 'overnight', "max_seconds": None, "stagnation_generations": None},
+            {"profile": 'interactive', "max_seconds": None, "stagnation_generations": 10},
+        ):
+            response = client.post('/api/generate/', {"budget": budget}, format='json')
+            self.assertEqual(response.status_code, 400, budget)
+            self.assertIn('budget', response.data)
+        self.assertTrue(SearchBudgetSerializer(data={"profile": 'overnight', "stagnation_generations": None}).is_valid())
+        self.assertTrue(SearchBudgetSerializer(data={"max_generations": None, "max_seconds": 5}).is_valid())
+
+    def test_body_must_be_an_object(self):
+        response = APIClient().post('/api/generate/', [{"budget": {"profile": 'interactive'}}], format='json')
+        self.assertEqual(response.status_code, 400)
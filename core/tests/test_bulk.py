@@ -0,0 +1,40 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Teacher
+from core.tests.base import SchoolDataTestCase
+
+
+class BulkEndpointTests(SchoolDataTestCase):
+    def create(self, count):
+        rows = [{"name": f"Teacher {k}", "designation": 'PRT', "max_periods_per_week": 30} for k in range(count)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/teachers/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data, len(queries)
+
+    def test_create_and_update_round_trip(self):
+        created, _ = self.create(3)
+        self.assertEqual([row['name'] for row in created], ['Teacher 0', 'Teacher 1', 'Teacher 2'])
+        changes = [{"id": row['id'], "max_periods_per_week": 10 + k} for k, row in enumerate(created)]
+        response = self.client.patch('/api/teachers/bulk/', changes, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(Teacher.objects.filter(pk__in=[row['id'] for row in created]).order_by('pk').values_list(
+                'name', 'max_periods_per_week'
+            )),
+            [('Teacher 0', 10), ('Teacher 1', 11), ('Teacher 2', 12)],
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        _, few = self.create(5)
+        _, many = self.create(50)
+        self.assertEqual(few, many)
+
+    def test_invalid_row_rejects_the_batch(self):
+        response = self.client.post('/api/teachers/bulk/', [
+            {"name": 'Ok', "designation": 'PRT', "max_periods_per_week": 30},
+            {"name": 'Bad', "designation": 'PRT'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Teacher.objects.filter(name='Ok').exists())
@@ -0,0 +1,28 @@
+from core.cache import fingerprint, get_cached_result, store_result
+from core.jobs import generator_options, load_school_data
+from core.tests.base import SchoolDataTestCase
+
+
+class ResultCacheTests(SchoolDataTestCase):
+    def key(self):
+        return fingerprint(load_school_data(), {}, {})
+
+    def test_hit_until_school_data_is_saved(self):
+        key = self.key()
+        store_result(key, {"status": 'success'})
+        self.assertEqual(get_cached_result(key), {"status": 'success'})
+        self.teacher.max_periods_per_week = 25
+        self.teacher.save()
+        self.assertIsNone(get_cached_result(key))
+
+    def test_cleared_on_delete(self):
+        key = self.key()
+        store_result(key, {"status": 'success'})
+        self.subject.delete()
+        self.assertIsNone(get_cached_result(key))
+
+    def test_enqueue_serves_cached_result(self):
+        store_result(fingerprint(load_school_data(), {}, generator_options()), {"status": 'success'})
+        response = self.client.post('/api/generate/', {}, format='json')
+        self.assertEqual(response.data['status'], 'COMPLETE')
+        self.assertTrue(response.data['from_cache'])
@@ -0,0 +1,68 @@
+from django.test import TestCase
+
+from core.benchmarks import synthetic_school_data
+from core.constraints import HARD, SOFT
+from core.generator import HARD_CONSTRAINT_WEIGHT, Genome, TimetableGenerator
+
+
+class ConstraintCompilationTests(TestCase):
+    def setUp(self):
+        # A single lesson period, so a placement's fitness is its constraint penalty alone
+        self.data = synthetic_school_data(groups=1, subjects=1, periods_per_week=1, seed=3)
+        self.teacher_id = self.data['lessons'][0]['teacher_ids'][0]
+        self.group_id = self.data['lessons'][0]['student_group_id']
+
+    def generator(self, level, weight=0):
+        self.data['constraints'] = [
+            {"id": 1, "type_name": 'TEACHER_UNAVAILABLE', "constraint_level": level, "weight": weight,
+             "parameters": {"teacher_id": str(self.teacher_id), "day": 'Monday', "period": '1'}},
+            {"id": 2, "type_name": 'GROUP_UNAVAILABLE', "constraint_level": level, "weight": weight,
+             "parameters": {"student_group_id": str(self.group_id), "day": '1', "period": '2'}},
+        ]
+        return TimetableGenerator(self.data, seed=3)
+
+    def placed(self, generator, slot):
+        return generator.calculate_fitness(Genome([slot], [generator.teacher_index[self.teacher_id]]))
+
+    def test_hard_constraints_count_as_violations(self):
+        generator = self.generator(HARD)
+        teacher = generator.teacher_index[self.teacher_id]
+        self.assertEqual(generator.hard_constraints.teacher_slot[teacher, generator.grid.slot(0, 0)], 1)
+        self.assertEqual(self.placed(generator, generator.grid.slot(2, 0)), 0)
+        self.assertEqual(self.placed(generator, generator.grid.slot(0, 0)), HARD_CONSTRAINT_WEIGHT)
+        self.assertEqual(self.placed(generator, generator.grid.slot(1, 1)), HARD_CONSTRAINT_WEIGHT)
+
+    def test_soft_constraints_add_their_weight(self):
+        generator = self.generator(SOFT, weight=7)
+        self.assertFalse(generator.hard_constraints.teacher_slot.any())
+        self.assertEqual(self.placed(generator, generator.grid.slot(2, 0)), 0)
+        self.assertEqual(self.placed(generator, generator.grid.slot(0, 0)), 7)
+        self.assertEqual(self.placed(generator, generator.grid.slot(1, 1)), 7)
+
+    def test_bad_rows_are_skipped_with_a_warning(self):
+        self.data['constraints'] = [
+            {"id": 9, "type_name": 'TEACHER_UNAVAILABLE', "constraint_level": HARD, "weight": 0,
+             "parameters": {"teacher_id": 'x', "day": 'Monday', "period": '1'}},
+        ]
+        with self.assertLogs('core.constraints', 'WARNING'):
+            generator = TimetableGenerator(self.data, seed=3)
+        self.assertEqual(len(generator.constraint_warnings), 1)
+        self.assertFalse(generator.hard_constraints.teacher_slot.any())
+
+    def test_consecutive_period_limit(self):
+        self.data = synthetic_school_data(groups=1, subjects=1, periods_per_week=3, seed=3)
+        self.data['constraints'] = [
+            {"id": 1, "type_name": 'TEACHER_MAX_CONSECUTIVE_PERIODS', "constraint_level": SOFT, "weight": 5,
+             "parameters": {"teacher_id": self.teacher_id, "max_periods": 2}},
+        ]
+        generator = TimetableGenerator(self.data, seed=3)
+        teacher = generator.teacher_index[self.teacher_id]
+        slot = generator.grid.slot
+        last = generator.grid.periods_in_day - 1
+
+        def placed(*cells):
+            return generator.calculate_fitness(Genome([slot(*cell) for cell in cells], [teacher] * len(cells)))
+
+        self.assertEqual(placed((0, 0), (0, 1), (0, 2)), 5)
+        self.assertEqual(placed((0, 0), (0, 1), (0, 3)), 0)
+        self.assertEqual(placed((0, last - 1), (0, last), (1, 0)), 0)
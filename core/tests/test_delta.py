@@ -0,0 +1,38 @@
+import random
+
+from django.test import TestCase
+
+from core.benchmarks import synthetic_school_data
+from core.constraints import SOFT
+from core.generator import OccupancyState, TimetableGenerator
+
+
+class DeltaEvaluationTests(TestCase):
+    def test_moves_and_swaps_match_full_rescoring(self):
+        data = synthetic_school_data(groups=4, constraint_density=0.2, seed=2)
+        data['constraints'].append({
+            "id": 0, "type_name": 'TEACHER_MAX_PERIODS_PER_DAY', "constraint_level": SOFT, "weight": 3,
+            "parameters": {"teacher_id": data['teachers'][0]['id'], "max_periods": 2},
+        })
+        data['constraints'].append({
+            "id": 0, "type_name": 'TEACHER_MAX_CONSECUTIVE_PERIODS', "constraint_level": SOFT, "weight": 2,
+            "parameters": {"teacher_id": data['teachers'][1]['id'], "max_periods": 1},
+        })
+        generator = TimetableGenerator(data, seed=2)
+        state = OccupancyState(generator, generator.random_individual())
+        rnd = random.Random(2)
+        n = len(generator.lesson_requirements)
+        for _ in range(300):
+            i = rnd.randrange(n)
+            if rnd.random() < 0.5:
+                slot, teacher = rnd.randrange(generator.n_slots), rnd.choice(generator.requirement_teachers[i])
+                delta = state.move_delta(i, slot, teacher)
+                before = state.fitness
+                state.apply_move(i, slot, teacher)
+            else:
+                j = rnd.randrange(n)
+                delta = state.swap_delta(i, j)
+                before = state.fitness
+                state.apply_swap(i, j)
+            self.assertEqual(state.fitness - before, delta)
+            self.assertEqual(state.fitness, generator.calculate_fitness(state.to_genome()))
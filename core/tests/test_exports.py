@@ -0,0 +1,44 @@
+import io
+
+import openpyxl
+
+from core.generator import Genome, TimetableGenerator
+from core.jobs import load_school_data
+from core.timetables import save_timetable
+from core.tests.base import SchoolDataTestCase
+
+
+class ExportTests(SchoolDataTestCase):
+    def setUp(self):
+        super().setUp()
+        generator = TimetableGenerator(load_school_data(), seed=4)
+        self.timetable = save_timetable(generator, Genome([0, 1], [0, 0]))
+
+    def test_school_export(self):
+        response = self.client.post('/api/export/all/', {"timetable_id": str(self.timetable.pk)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(workbook.sheetnames, ['Grade 9A', 'Grade 9B', 'T - Asha'])
+        for timetable_id in ('abc', {"id": 1}, self.timetable.pk + 1):
+            response = self.client.post('/api/export/all/', {"timetable_id": timetable_id}, format='json')
+            self.assertEqual(response.status_code, 400, timetable_id)
+
+    def test_group_export(self):
+        group = self.groups[0]
+        body = {"timetable_id": self.timetable.pk, "student_group_id": str(group.pk)}
+        response = self.client.post('/api/export/', body, format='json')
+        self.assertEqual(response.status_code, 200)
+        sheet = openpyxl.load_workbook(io.BytesIO(response.content)).active
+        self.assertEqual(sheet.title, 'Grade 9A')
+        self.assertEqual(sheet.cell(row=2, column=2).value, 'Maths\nAsha')
+
+    def test_group_export_bad_ids(self):
+        for body in (
+            {"timetable_id": 'abc', "student_group_id": 1}, {"timetable_id": self.timetable.pk, "student_group_id": 'x'}, [1],
+        ):
+            self.assertEqual(self.client.post('/api/export/', body, format='json').status_code, 400, body)
+        for body in (
+            {"timetable_id": self.timetable.pk + 1, "student_group_id": self.groups[0].pk},
+            {"timetable_id": self.timetable.pk, "student_group_id": self.groups[1].pk + 1},
+        ):
+            self.assertEqual(self.client.post('/api/export/', body, format='json').status_code, 404, body)
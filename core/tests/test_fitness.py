@@ -0,0 +1,56 @@
+import numpy as np
+from django.test import TestCase
+
+from core.benchmarks import synthetic_school_data
+from core.constraints import HARD, SOFT
+from core.generator import HARD_CONSTRAINT_WEIGHT, FitnessEngine, TimetableGenerator
+
+
+def reference_components(engine, slots, teachers):
+    """ (hard, soft) of one individual counted lesson by lesson, to check the batched engine against. """
+    teacher_cells, group_cells, load, day_load = {}, {}, {}, {}
+    hard = soft = 0
+    for i, (slot, teacher) in enumerate(zip(slots, teachers)):
+        group = engine.lesson_groups[i]
+        hard += (teacher, slot) in teacher_cells
+        hard += (group, slot) in group_cells
+        teacher_cells[teacher, slot] = group_cells[group, slot] = True
+        load[teacher] = load.get(teacher, 0) + 1
+        day = engine.slot_days[slot]
+        day_load[teacher, day] = day_load.get((teacher, day), 0) + 1
+    hard += sum(max(0, count - engine.teacher_capacity[teacher]) for teacher, count in load.items())
+    for compiled, level in ((engine.hard, HARD), (engine.soft, SOFT)):
+        if compiled is None:
+            continue
+        penalty = sum(
+            compiled.teacher_slot[teacher, slot] + compiled.requirement_slot[i, slot]
+            for i, (slot, teacher) in enumerate(zip(slots, teachers))
+        )
+        penalty += sum(
+            max(0, count - compiled.daily_limit[teacher]) * compiled.daily_weight[teacher]
+            for (teacher, _), count in day_load.items()
+        )
+        if level == HARD:
+            hard += penalty
+        else:
+            soft += penalty
+    return hard, soft
+
+
+class FitnessEngineTests(TestCase):
+    def test_counts_clashes_and_overload(self):
+        engine = FitnessEngine(n_slots=4, lesson_groups=[0, 0, 1], teacher_capacity=[2, 5])
+        slots = np.array([[0, 1, 0], [0, 0, 0]])
+        teachers = np.array([[0, 0, 1], [0, 0, 0]])
+        # Row 1: two teacher clashes, one group clash, teacher 0 one period over capacity
+        self.assertEqual(engine.evaluate(slots, teachers).tolist(), [0, 4 * HARD_CONSTRAINT_WEIGHT])
+
+    def test_matches_reference_on_random_population(self):
+        generator = TimetableGenerator(synthetic_school_data(groups=4, constraint_density=0.2, seed=1), seed=1)
+        population = [generator.random_individual() for _ in range(20)]
+        slots = np.stack([genome.slots for genome in population])
+        teachers = np.stack([genome.teachers for genome in population])
+        hard, soft = generator.fitness_engine.evaluate_components(slots, teachers)
+        for row, genome in enumerate(population):
+            expected = reference_components(generator.fitness_engine, genome.slots.tolist(), genome.teachers.tolist())
+            self.assertEqual((hard[row], soft[row]), expected)
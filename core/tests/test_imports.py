@@ -0,0 +1,35 @@
+import io
+
+from core.models import Lesson
+from core.tests.base import SchoolDataTestCase
+
+
+class ImportTests(SchoolDataTestCase):
+    def upload(self, **files):
+        payload = {}
+        for table, text in files.items():
+            upload = io.BytesIO(text.encode())
+            upload.name = f"{table}.csv"
+            payload[table] = upload
+        return self.client.post('/api/import/', payload, format='multipart')
+
+    def test_reports_rejected_rows(self):
+        response = self.upload(
+            teachers="name,designation,max_periods_per_week\nBina,PRT,30\nAsha,PGT,20\nChen,PRT,\n",
+            lessons=(
+                "subject,student_group,teachers,periods_per_week\n"
+                "Maths,Grade 9A,Bina,4\nPhysics,Grade 9A,Bina,4\nMaths,Grade 9B,Nobody,2\n"
+            ),
+        )
+        self.assertEqual(response.status_code, 200)
+        teachers, lessons = response.data['teachers'], response.data['lessons']
+        self.assertEqual(teachers['created'], 1)
+        # Row 3 repeats an existing name, row 4 has no max_periods_per_week
+        self.assertEqual([(row['row'], sorted(row['errors'])) for row in teachers['rejected']], [
+            (3, ['name']), (4, ['max_periods_per_week']),
+        ])
+        self.assertEqual(lessons['created'], 1)
+        self.assertEqual([(row['row'], sorted(row['errors'])) for row in lessons['rejected']], [
+            (3, ['subject']), (4, ['teachers']),
+        ])
+        self.assertTrue(Lesson.objects.filter(student_group=self.groups[0], teachers__name='Bina').exists())
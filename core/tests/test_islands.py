@@ -0,0 +1,34 @@
+import os
+from unittest import mock
+
+from django.test import TestCase
+
+from core.benchmarks import synthetic_school_data
+from core.generator import GAParameters, IslandError, SearchBudget, TimetableGenerator
+
+
+@mock.patch('core.generator.ISLAND_POLL_SECONDS', 0.1)
+class IslandFailureTests(TestCase):
+    def run_islands(self, seeding):
+        generator = TimetableGenerator(
+            synthetic_school_data(groups=2, seed=9), seed=9, parameters=GAParameters(population_size=20),
+        )
+        # Islands are forked, so they inherit the patched method
+        with mock.patch.object(TimetableGenerator, 'generate_initial_population', side_effect=seeding):
+            with self.assertRaises(IslandError) as raised:
+                generator.run_island_generation(2, budget=SearchBudget(max_generations=3))
+        return str(raised.exception)
+
+    def test_island_exception_is_reported(self):
+        def seeding(deadline=None):
+            raise RuntimeError('seeding broke')
+
+        message = self.run_islands(seeding)
+        self.assertIn('failed', message)
+        self.assertIn('seeding broke', message)
+
+    def test_dead_island_is_reported(self):
+        def seeding(deadline=None):
+            os._exit(3)
+
+        self.assertIn('(code 3) without reporting a result', self.run_islands(seeding))
@@ -0,0 +1,63 @@
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.generator import Genome, TimetableGenerator
+from core.jobs import load_school_data
+from core.models import GenerationJob
+from core.timetables import save_timetable
+from core.tests.base import SchoolDataTestCase
+
+
+class GenerationJobViewsTests(TestCase):
+    def setUp(self):
+        self.job = GenerationJob.objects.create(status=GenerationJob.STATUS_COMPLETE, result={
+            "schedules": {"Grade 9A": []}, "teacher_schedules": {"Asha": []}, "slot_matrix": [],
+        })
+
+    def test_only_schedules_by_default(self):
+        data = APIClient().get(f'/api/generate/{self.job.pk}/').data
+        self.assertEqual(data['schedules'], {"Grade 9A": []})
+        self.assertNotIn('teacher_schedules', data)
+        self.assertNotIn('slot_matrix', data)
+
+    def test_other_views_are_opt_in(self):
+        data = APIClient().get(f'/api/generate/{self.job.pk}/?views=teacher_schedules,slot_matrix').data
+        self.assertNotIn('schedules', data)
+        self.assertEqual((data['teacher_schedules'], data['slot_matrix']), ({"Asha": []}, []))
+
+
+class CompactFormatTests(SchoolDataTestCase):
+    def setUp(self):
+        super().setUp()
+        generator = TimetableGenerator(load_school_data(), seed=4)
+        timetable = save_timetable(generator, Genome([0, 1], [0, 0]))
+        self.job = GenerationJob.objects.create(status=GenerationJob.STATUS_COMPLETE, result={
+            "schedules": {"Grade 9A": []}, "timetable_id": timetable.pk,
+        })
+
+    def check_compact(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.timetable.compact+json')
+        data = json.loads(response.content)
+        self.assertNotIn('schedules', data)
+        return data
+
+    def test_format_parameter(self):
+        timetable = self.check_compact(self.client.get(f'/api/generate/{self.job.pk}/?format=compact'))['timetable']
+        self.assertEqual(timetable['teachers'], [[self.teacher.pk, 'Asha']])
+        self.assertEqual(timetable['student_groups'], [[group.pk, group.group_name] for group in self.groups])
+        self.assertEqual(timetable['lessons']['slot'], [0, 1])
+        self.assertEqual(timetable['lessons']['teacher'], [0, 0])
+        self.assertEqual(timetable['slots'][:2], [[0, 0], [0, 1]])
+
+    def test_accept_header(self):
+        response = self.client.get(f'/api/generate/{self.job.pk}/', HTTP_ACCEPT='application/vnd.timetable.compact+json')
+        self.assertEqual(self.check_compact(response)['timetable']['days'], ['Monday', 'Tuesday'])
+
+    def test_pending_job_has_no_timetable(self):
+        job = GenerationJob.objects.create()
+        data = self.check_compact(self.client.get(f'/api/generate/{job.pk}/?format=compact'))
+        self.assertEqual(data['status'], GenerationJob.STATUS_PENDING)
+        self.assertIsNone(data['timetable'])
@@ -0,0 +1,103 @@
+import multiprocessing
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.benchmarks import synthetic_school_data
+from core.generator import SearchBudget, TimetableGenerator
+from core.jobs import claim_next_job, heartbeat, recover_stale_jobs, run_worker
+from core.models import GeneratedTimetable, GenerationJob
+from core.tests.base import SchoolDataTestCase
+
+
+class HeartbeatTests(TransactionTestCase):
+    def setUp(self):
+        self.job = GenerationJob.objects.create(status=GenerationJob.STATUS_RUNNING)
+
+    def beats_after(self, start):
+        with heartbeat(self.job, interval=0.05) as start_heartbeat:
+            if start:
+                start_heartbeat()
+                start_heartbeat()
+            time.sleep(0.3)
+        self.job.refresh_from_db()
+        return self.job.heartbeat_at is not None
+
+    def test_beats_once_started(self):
+        self.assertTrue(self.beats_after(start=True))
+
+    def test_waits_for_start(self):
+        self.assertFalse(self.beats_after(start=False))
+
+    def test_generator_starts_it_after_forking(self):
+        # The evaluation pool is already forked when on_started runs
+        generator = TimetableGenerator(synthetic_school_data(groups=2, seed=1), workers=2, seed=1)
+        calls = []
+        generator.run_generation(
+            budget=SearchBudget(max_generations=2), on_started=lambda: calls.append(len(multiprocessing.active_children())),
+        )
+        self.assertEqual(calls, [2])
+
+
+class WorkerTests(SchoolDataTestCase):
+    def queue(self, **fields):
+        return GenerationJob.objects.create(parameters={"budget": {"max_generations": 2}}, **fields)
+
+    def queue_stale(self, attempts, heartbeat_seconds_ago=3600):
+        return self.queue(
+            status=GenerationJob.STATUS_RUNNING, attempts=attempts,
+            started_at=self.ago(3600), heartbeat_at=self.ago(heartbeat_seconds_ago),
+        )
+
+    def test_claims_and_completes_pending_job(self):
+        job = self.queue()
+        run_worker(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_COMPLETE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.heartbeat_at)
+        self.assertTrue(GeneratedTimetable.objects.filter(pk=job.result['timetable_id'], job=job).exists())
+
+    def test_failed_save_fails_job(self):
+        job = self.queue()
+        with mock.patch('core.jobs.save_timetable', side_effect=RuntimeError('disk full')):
+            run_worker(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'disk full')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_error_escaping_run_job_fails_job(self):
+        job = self.queue()
+        with mock.patch('core.jobs.GenerationJob.save', side_effect=RuntimeError('database gone')):
+            run_worker(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'database gone')
+
+    @override_settings(GENERATION_JOB_STALE_SECONDS=60, GENERATION_JOB_MAX_ATTEMPTS=2)
+    def test_stale_job_is_requeued_and_run_again(self):
+        job = self.queue_stale(attempts=1)
+        alive = self.queue_stale(attempts=1, heartbeat_seconds_ago=5)
+        run_worker(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_COMPLETE)
+        self.assertEqual(job.attempts, 2)
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, GenerationJob.STATUS_RUNNING)
+
+    @override_settings(GENERATION_JOB_STALE_SECONDS=60, GENERATION_JOB_MAX_ATTEMPTS=2)
+    def test_stale_job_fails_after_max_attempts(self):
+        job = self.queue_stale(attempts=2)
+        self.assertEqual(recover_stale_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.STATUS_FAILED)
+        self.assertIn('2 attempt(s)', job.error)
+        self.assertIsNone(claim_next_job())
+
+    @staticmethod
+    def ago(seconds):
+        return timezone.now() - timedelta(seconds=seconds)
@@ -0,0 +1,24 @@
+import numpy as np
+from django.test import TestCase
+
+from core.benchmarks import synthetic_school_data
+from core.generator import GAParameters, ParallelEvaluator, TimetableGenerator
+
+
+class ParallelEvaluatorTests(TestCase):
+    def test_matches_serial_evaluation(self):
+        generator = TimetableGenerator(
+            synthetic_school_data(groups=4, constraint_density=0.2, seed=10), seed=10,
+            parameters=GAParameters(population_size=30),
+        )
+        population = generator.generate_initial_population()
+        slots = np.stack([genome.slots for genome in population])
+        teachers = np.stack([genome.teachers for genome in population])
+        expected = generator.fitness_engine.evaluate(slots, teachers)
+        # One chunk per worker, and uneven chunks where the last one is shorter
+        for chunk_size in (None, 7):
+            evaluator = ParallelEvaluator(generator.fitness_engine, workers=2, chunk_size=chunk_size)
+            try:
+                np.testing.assert_array_equal(evaluator.evaluate(slots, teachers), expected)
+            finally:
+                evaluator.close()
@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from core.benchmarks import synthetic_school_data
+from core.generator import GAParameters, SearchBudget, TimetableGenerator
+
+
+class SeedReproducibilityTests(TestCase):
+    # No target, so every island runs the full generation count whichever finishes first
+    budget = SearchBudget(max_generations=5, target_fitness=-1)
+
+    def generate(self, seed, islands=1, workers=1):
+        generator = TimetableGenerator(
+            synthetic_school_data(groups=3, seed=8), workers=workers, seed=seed,
+            parameters=GAParameters(population_size=20),
+        )
+        if islands > 1:
+            result = generator.run_island_generation(islands, migration_interval=2, budget=self.budget)
+        else:
+            result = generator.run_generation(budget=self.budget)
+        self.assertEqual(result['seed'], seed)
+        return generator.best_genome.slots.tolist(), generator.best_genome.teachers.tolist(), result['schedules']
+
+    def run_twice(self, islands=1, workers=1):
+        self.assertEqual(self.generate(1234, islands, workers), self.generate(1234, islands, workers))
+
+    def test_single_population(self):
+        self.run_twice()
+
+    def test_parallel_evaluation(self):
+        self.run_twice(workers=2)
+
+    def test_islands(self):
+        self.run_twice(islands=2)
+
+    def test_seed_changes_the_result(self):
+        self.assertNotEqual(self.generate(1234), self.generate(1235))
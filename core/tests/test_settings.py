@@ -0,0 +1,28 @@
+from core.tests.base import SchoolDataTestCase
+
+
+class AlgorithmSettingsTests(SchoolDataTestCase):
+    def put(self, key, value):
+        return self.client.put(f'/api/settings/{key}/', {"value": value}, format='json')
+
+    def test_elitism_checked_against_effective_population_size(self):
+        # The default population is POPULATION_SIZE, not the smallest allowed one
+        self.assertEqual(self.put('elitism_count', 20).status_code, 200)
+        response = self.put('population_size', 20)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('elitism_count', response.data['value'])
+        self.assertEqual(self.client.post('/api/generate/', {"settings": {"population_size": 40}}, format='json').status_code, 202)
+        response = self.client.post('/api/generate/', {"settings": {"population_size": 21}}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_auto_profile_uses_its_own_population_size(self):
+        # Two lesson periods: the 'auto' population is the smallest of its range
+        self.assertEqual(self.put('profile', 'auto').status_code, 200)
+        self.assertEqual(self.put('elitism_count', 28).status_code, 200)
+        self.assertEqual(self.put('elitism_count', 29).status_code, 400)
+
+    def test_delete_keeps_the_combination_valid(self):
+        self.put('population_size', 1000)
+        self.put('elitism_count', 500)
+        self.assertEqual(self.client.delete('/api/settings/population_size/').status_code, 400)
+        self.assertEqual(self.client.delete('/api/settings/elitism_count/').status_code, 204)
@@ -0,0 +1,22 @@
+from datetime import time
+
+from django.test import TestCase
+
+from core.slots import SlotGrid
+
+
+class SlotGridTests(TestCase):
+    def test_adjacency_tables(self):
+        # Monday has three periods, Tuesday two
+        grid = SlotGrid.from_timeslots([
+            {"id": pk, "day_of_week": day, "start_time": time(hour)}
+            for pk, (day, hour) in enumerate([(0, 8), (0, 9), (0, 10), (1, 8), (1, 9)], start=1)
+        ])
+        self.assertEqual(grid.day_slots, [[0, 1, 2], [3, 4]])
+        self.assertEqual(grid.slot_period.tolist(), [0, 1, 2, 0, 1])
+        self.assertEqual(grid.next_slot.tolist(), [1, 2, -1, 4, -1])
+        self.assertEqual(grid.prev_slot.tolist(), [-1, 0, 1, -1, 3])
+        self.assertTrue(grid.consecutive[1, 0] and grid.consecutive[1, 2])
+        self.assertFalse(grid.consecutive[2, 3])
+        self.assertTrue(grid.same_day[0, 2])
+        self.assertFalse(grid.same_day[2, 3])
@@ -0,0 +1,38 @@
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase
+
+from core import telemetry
+from core.generator import Genome
+from core.telemetry import TELEMETRY_MAX_GENERATIONS, GenerationTelemetry
+
+
+class GenerationTelemetryTests(TestCase):
+    population = [Genome([0, 1, 2], [0, 0, 0]), Genome([0, 1, 3], [0, 0, 0])]
+    scores = np.array([5, 9])
+
+    def record(self, generations):
+        recorder = GenerationTelemetry()
+        for generation in range(1, generations + 1):
+            recorder.record_generation(generation, self.scores, self.population, generation * 2)
+        return recorder
+
+    def test_series_is_thinned_and_ends_with_the_latest_generation(self):
+        generations = TELEMETRY_MAX_GENERATIONS * 16 + 3
+        with (mock.patch.object(telemetry, 'diversity', wraps=telemetry.diversity) as diversity,
+              mock.patch.object(telemetry.logger, 'isEnabledFor', return_value=False)):
+            data = self.record(generations).as_dict()
+        series = data['generations']
+        self.assertLessEqual(len(series), TELEMETRY_MAX_GENERATIONS + 1)
+        self.assertEqual(data['generation_stride'], 16)
+        self.assertEqual(series[-1]['generation'], generations)
+        self.assertTrue(all(entry['generation'] % 16 == 0 for entry in series[:-1]))
+        self.assertEqual(series[-1]['diversity'], 0.1667)
+        # Skipped generations never stack the population
+        self.assertLess(diversity.call_count, generations / 4)
+
+    def test_every_generation_is_logged_at_debug_level(self):
+        with self.assertLogs('core.telemetry', 'DEBUG') as logs:
+            self.record(TELEMETRY_MAX_GENERATIONS * 2 + 1)
+        self.assertEqual(len(logs.records), TELEMETRY_MAX_GENERATIONS * 2 + 1)
@@ -0,0 +1,27 @@
+from core.generator import Genome, TimetableGenerator
+from core.jobs import load_school_data
+from core.models import ScheduledLesson
+from core.timetables import compact_timetable, load_timetable, save_timetable
+from core.tests.base import SchoolDataTestCase
+
+
+class StoredTimetableTests(SchoolDataTestCase):
+    def setUp(self):
+        super().setUp()
+        generator = TimetableGenerator(load_school_data(), seed=4)
+        self.timetable = save_timetable(generator, Genome([0, 1], [0, 0]))
+
+    def test_rows_outlive_deleted_school_data(self):
+        self.assertEqual([row['teacher_id'] for row in load_timetable(self.timetable.pk)['lessons']], [self.teacher.pk] * 2)
+        self.teacher.delete()
+        self.lessons[0].delete()
+        self.assertEqual(ScheduledLesson.objects.filter(timetable=self.timetable).count(), 2)
+        # The cached copy is not served once the school data changed
+        timetable = load_timetable(self.timetable.pk)
+        self.assertEqual([row['teacher_id'] for row in timetable['lessons']], [None, None])
+        self.assertEqual([row['lesson_id'] for row in timetable['lessons']], [None, self.lessons[1].pk])
+        self.assertEqual([row['teacher_name'] for row in timetable['lessons']], ['Asha', 'Asha'])
+        self.assertEqual([row['subject_name'] for row in timetable['lessons']], ['Maths', 'Maths'])
+        self.assertEqual(compact_timetable(timetable)['teachers'], [[None, 'Asha']])
+        response = self.client.post('/api/export/all/', {"timetable_id": self.timetable.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,47 @@
+from core.generator import Genome, TimetableGenerator
+from core.jobs import load_school_data
+from core.timetables import save_timetable
+from core.tests.base import SchoolDataTestCase
+
+
+class MoveValidatorTests(SchoolDataTestCase):
+    def setUp(self):
+        super().setUp()
+        # Grade 9A on Monday period 1, Grade 9B on Monday period 2, both with the same teacher
+        generator = TimetableGenerator(load_school_data(), seed=4)
+        self.timetable = save_timetable(generator, Genome([0, 1], [0, 0]))
+
+    def validate(self, position, day, timeslot):
+        return self.client.post('/api/validate-move/', {
+            "timetable_id": self.timetable.pk, "moved_lesson_id": position, "new_day": day, "new_timeslot": timeslot,
+        }, format='json')
+
+    def test_rejects_teacher_clash(self):
+        response = self.validate(1, 'Monday', 'Period 1')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['valid'])
+        self.assertEqual(response.data['conflicting_lesson_id'], 0)
+
+    def test_accepts_free_slot(self):
+        response = self.validate(1, 'Tuesday', 'Period 3')
+        self.assertEqual(response.data, {"valid": True, "soft_delta": 0})
+
+    def test_ids_may_be_digit_strings(self):
+        response = self.client.post('/api/validate-move/', {
+            "timetable_id": str(self.timetable.pk), "moved_lesson_id": '1', "new_day": 'Monday', "new_timeslot": 'Period 1',
+        }, format='json')
+        self.assertFalse(response.data['valid'])
+        response = self.client.post('/api/suggest-slots/', {"timetable_id": str(self.timetable.pk), "lesson_id": 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn({"day": 'Tuesday', "timeslot": 'Period 3', "soft_delta": 0}, response.data['moves'])
+
+    def test_bad_ids_are_rejected(self):
+        for timetable_id in ('abc', -1, 1.5, None, [1]):
+            response = self.client.post('/api/suggest-slots/', {"timetable_id": timetable_id, "lesson_id": 0}, format='json')
+            self.assertEqual(response.status_code, 400, timetable_id)
+        response = self.client.post('/api/validate-move/', {
+            "timetable_id": 'abc', "moved_lesson_id": 0, "new_day": 'Monday', "new_timeslot": 'Period 1',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/api/validate-move/', [1], format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/suggest-slots/', [1], format='json').status_code, 400)
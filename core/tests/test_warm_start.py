@@ -0,0 +1,27 @@
+from django.test import TestCase
+
+from core.benchmarks import synthetic_school_data
+from core.constraints import HARD
+from core.generator import TimetableGenerator
+
+
+class WarmStartTests(TestCase):
+    def test_keeps_only_feasible_placements(self):
+        data = synthetic_school_data(groups=2, subjects=1, periods_per_week=2, teachers=1, seed=5)
+        teacher_id = data['teachers'][0]['id']
+        data['constraints'] = [{
+            "id": 1, "type_name": 'TEACHER_UNAVAILABLE', "constraint_level": HARD, "weight": 0,
+            "parameters": {"teacher_id": teacher_id, "day": 'Monday', "period": 2},
+        }]
+        first, second = (lesson['id'] for lesson in data['lessons'])
+        warm_start = [
+            {"lesson_id": first, "teacher_id": teacher_id, "slot": 0},
+            {"lesson_id": first, "teacher_id": teacher_id, "slot": 1},  # Teacher now unavailable
+            {"lesson_id": second, "teacher_id": teacher_id, "slot": 0},  # Teacher clash
+            {"lesson_id": second, "teacher_id": teacher_id, "slot": 5},
+        ]
+        generator = TimetableGenerator(data, warm_start=warm_start, seed=5)
+        base = generator.warm_start_population()[0]
+        self.assertEqual(generator.warm_start_stats, {"kept": 2, "repaired": 2})
+        self.assertEqual(generator.calculate_fitness(base), 0)
+        self.assertEqual((base.slots[0], base.slots[3]), (0, 5))
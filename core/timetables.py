@@ -0,0 +1,159 @@
+# core/timetables.py
+"""
+Stored timetables.
+
+A finished run's best genome is written as ScheduledLesson rows in one
+bulk insert. Export and move validation read those rows by timetable id
+instead of having the client post the whole schedule back. Rows keep the
+subject, group and teacher names they were generated with; deleting a
+lesson, group or teacher only clears the row's reference to it. Cached
+reads are keyed on the school data version (see
+core.cache.school_data_version), so such deletions are picked up. Each
+timetable keeps the slot grid it was generated on (see core.slots), so
+later TimeSlot edits do not shift its lessons.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .cache import school_data_version
+from .models import GeneratedTimetable, ScheduledLesson, StudentGroup
+from .slots import SlotGrid
+
+TIMETABLE_CACHE_TIMEOUT = 60 * 60
+
+
+def save_timetable(generator, genome, job=None, fingerprint=''):
+    """ Writes `genome` as a GeneratedTimetable with one ScheduledLesson per requirement. """
+    with transaction.atomic():
+        timetable = GeneratedTimetable.objects.create(
+            job=job, fingerprint=fingerprint, best_fitness=generator.calculate_fitness(genome),
+            days=generator.days, periods_in_day=generator.periods_in_day, grid=generator.grid.as_dict(),
+        )
+        ScheduledLesson.objects.bulk_create([
+            ScheduledLesson(
+                timetable=timetable, position=position, lesson_id=assignment['lesson_id'],
+                student_group_id=req['group_id'], teacher_id=assignment['teacher_id'], slot=assignment['slot'],
+                subject_name=generator.subjects.get(req['subject_id'], {}).get('subject_name', ''),
+                group_name=generator.student_groups.get(req['group_id'], {}).get('group_name', ''),
+                teacher_name=generator.teachers[assignment['teacher_id']]['name'],
+            )
+            for position, (req, assignment) in enumerate(
+                zip(generator.lesson_requirements, generator.assignments(genome))
+            )
+        ], batch_size=1000)
+    return timetable
+
+
+def load_timetable(pk):
+    """
+    The timetable's grid and its rows in position order, or None if it does
+    not exist. Each row is a dict with position, lesson_id, student_group_id,
+    teacher_id, slot, subject_id, teacher_name, subject_name and group_name;
+    the ids are None where that row has since been deleted.
+    """
+    key = f"timetable:{pk}:{school_data_version()}"
+    timetable = cache.get(key)
+    if timetable is not None:
+        return timetable
+    row = GeneratedTimetable.objects.filter(pk=pk).values('id', 'days', 'periods_in_day', 'grid').first()
+    if row is None:
+        return None
+    lessons = ScheduledLesson.objects.filter(timetable_id=pk).order_by('position').values(
+        'position', 'lesson_id', 'student_group_id', 'teacher_id', 'slot', 'teacher_name', 'subject_name', 'group_name',
+        subject_id=F('lesson__subject_id'),
+    )
+    timetable = {**row, "lessons": list(lessons)}
+    cache.set(key, timetable, TIMETABLE_CACHE_TIMEOUT)
+    return timetable
+
+
+def latest_timetable_id():
+    """ Id of the most recently generated timetable, or None. """
+    return GeneratedTimetable.objects.order_by('-created_at').values_list('pk', flat=True).first()
+
+
+def timetable_grid(timetable):
+    """ The SlotGrid of a loaded timetable; timetables stored before grids were kept use days x periods_in_day. """
+    if timetable.get('grid'):
+        return SlotGrid.from_dict(timetable['grid'])
+    return SlotGrid.rectangular(timetable['days'], timetable['periods_in_day'])
+
+
+def warm_start_assignments(pk, grid=None):
+    """
+    The timetable's rows in the {lesson_id, teacher_id, slot} form
+    TimetableGenerator(warm_start=...) takes. With `grid`, slots are moved to
+    the same day and period of that grid; rows with no such slot are left out.
+    """
+    timetable = load_timetable(pk)
+    slots = None
+    if grid is not None:
+        stored = timetable_grid(timetable)
+        slots = [grid.slot_for_labels(*stored.labels(slot)) for slot in range(stored.n_slots)]
+    return [
+        {
+            "lesson_id": lesson['lesson_id'],
+            "teacher_id": lesson['teacher_id'],
+            "slot": lesson['slot'] if slots is None else slots[lesson['slot']],
+        }
+        for lesson in timetable['lessons']
+        if slots is None or slots[lesson['slot']] is not None
+    ]
+
+
+def group_schedule(timetable, group_id):
+    """ One group's schedule in the shape of a `schedules` entry of the generation result; None for an unknown group. """
+    group = StudentGroup.objects.filter(pk=group_id).values_list('group_name', flat=True).first()
+    if group is None:
+        return None
+    grid = timetable_grid(timetable)
+    lessons = {}
+    for lesson in timetable['lessons']:
+        if lesson['student_group_id'] == group_id and lesson['slot'] not in lessons:
+            day, timeslot = grid.labels(lesson['slot'])
+            lessons[lesson['slot']] = {
+                "id": lesson['position'],
+                "subject": lesson['subject_name'],
+                "teacher": lesson['teacher_name'],
+                "day": day,
+                "timeslot": timeslot,
+            }
+    return {
+        "student_group_name": group,
+        "days": grid.days,
+        "timeslots": grid.period_labels(),
+        "scheduled_lessons": list(lessons.values()),
+    }
+
+
+def compact_timetable(timetable):
+    """
+    Dictionary-encoded form of a timetable: teachers, subjects and groups are
+    listed once as [id, name] tables, and lessons are parallel columns of
+    integers. lessons['teacher'][k] indexes the teachers table, and
+    lessons['slot'][k] indexes `slots`, the [day, period] cell (0-based
+    indexes into days and timeslots) of every slot.
+    """
+    grid = timetable_grid(timetable)
+    tables = {'teachers': {}, 'subjects': {}, 'student_groups': {}}
+    columns = {'id': [], 'student_group': [], 'subject': [], 'teacher': [], 'slot': []}
+
+    def encode(table, key, name):
+        # Keyed on the name too, so rows whose id was cleared by a deletion keep apart
+        return tables[table].setdefault((key, name), (len(tables[table]), name))[0]
+
+    for lesson in timetable['lessons']:
+        columns['id'].append(lesson['position'])
+        columns['student_group'].append(encode('student_groups', lesson['student_group_id'], lesson['group_name']))
+        columns['subject'].append(encode('subjects', lesson['subject_id'], lesson['subject_name']))
+        columns['teacher'].append(encode('teachers', lesson['teacher_id'], lesson['teacher_name']))
+        columns['slot'].append(lesson['slot'])
+    return {
+        "id": timetable['id'],
+        "days": grid.days,
+        "timeslots": grid.period_labels(),
+        "slots": [list(cell) for cell in grid.cells],
+        **{table: [[key, name] for (key, _), (_, name) in rows.items()] for table, rows in tables.items()},
+        "lessons": columns,
+    }
@@ -3,7 +3,10 @@ from django.urls import path
 from rest_framework.routers import DefaultRouter
 from.views import (
     GenerateTimetableView,
+    GenerationJobView,
+    GenerationTelemetryView,
     ExportTimetableView,
+    ExportSchoolTimetableView,
     TeacherViewSet,
     SubjectViewSet,
     StudentGroupViewSet,
@@ -13,6 +16,9 @@ from.views import (
     ConstraintInstanceViewSet,
     ConstraintParameterViewSet,
     ValidateMoveView,
+    SuggestSlotsView,
+    ImportSchoolView,
+    AlgorithmSettingsViewSet,
 )
 
 router = DefaultRouter()
@@ -24,12 +30,18 @@ router.register(r'lessons', LessonViewSet)
 router.register(r'constraint-types', ConstraintTypeViewSet)
 router.register(r'constraint-instances', ConstraintInstanceViewSet)
 router.register(r'constraint-parameters', ConstraintParameterViewSet)
+router.register(r'settings', AlgorithmSettingsViewSet, basename='settings')
 
 urlpatterns = router.urls
 
 # This line adds the custom 'generate' endpoint
 urlpatterns += [
     path('generate/', GenerateTimetableView.as_view(), name='generate-timetable'),
+    path('generate/<int:pk>/', GenerationJobView.as_view(), name='generation-job'),
+    path('generate/<int:pk>/telemetry/', GenerationTelemetryView.as_view(), name='generation-telemetry'),
     path('export/', ExportTimetableView.as_view(), name='export-timetable'),
+    path('export/all/', ExportSchoolTimetableView.as_view(), name='export-school-timetable'),
     path('validate-move/', ValidateMoveView.as_view(), name='validate-move'),
+    path('suggest-slots/', SuggestSlotsView.as_view(), name='suggest-slots'),
+    path('import/', ImportSchoolView.as_view(), name='import-school'),
 ]
\ No newline at end of file
@@ -0,0 +1,173 @@
+# core/validation.py
+"""
+Move validation for drag-and-drop edits of a stored timetable.
+
+A MoveValidator maps a timetable's rows onto the current school data once
+and keeps teacher x slot and group x slot occupancy indexes next to the
+generator's OccupancyState counters, so each candidate move is answered in
+O(1). suggest() runs that check over every slot and proposes swaps where
+a direct move clashes. Validators are cached per process, keyed on the
+school data version (see core.cache.school_data_version), so data edits
+are picked up.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+
+from .cache import school_data_version
+from .generator import TimetableGenerator, Genome, OccupancyState
+from .jobs import load_school_data
+from .timetables import load_timetable, timetable_grid
+
+VALIDATOR_CACHE_SIZE = 8
+
+_validators = OrderedDict()
+
+
+class MoveValidator:
+    """ Occupancy of one stored timetable, checked against the current teachers, lessons and constraints. """
+    def __init__(self, timetable, school_data):
+        teacher_ids = {teacher['id'] for teacher in school_data['teachers']}
+        # The grid the timetable was generated on, whatever the TimeSlot rows are now
+        self.grid = timetable_grid(timetable)
+        n_slots = self.grid.n_slots
+        rows = defaultdict(list)
+        for row in timetable['lessons']:
+            if row['teacher_id'] in teacher_ids and row['slot'] < n_slots:
+                rows[row['lesson_id']].append(row)
+        # Only the lesson periods the timetable holds; periods added since it was generated are not placed
+        lessons = [
+            {**lesson, 'periods_per_week': min(lesson['periods_per_week'], len(rows[lesson['id']]))}
+            for lesson in school_data['lessons'] if rows[lesson['id']]
+        ]
+        self.generator = generator = TimetableGenerator({**school_data, 'lessons': lessons}, grid=self.grid)
+
+        # Frontend lesson ids are ScheduledLesson positions; the generator works on requirement indexes
+        self.requirement_position = []
+        slots, teachers = [], []
+        taken = defaultdict(int)
+        for req in generator.lesson_requirements:
+            row = rows[req['lesson_id']][taken[req['lesson_id']]]
+            taken[req['lesson_id']] += 1
+            self.requirement_position.append(row['position'])
+            slots.append(row['slot'])
+            teachers.append(generator.teacher_index[row['teacher_id']])
+        self.position_requirement = {position: i for i, position in enumerate(self.requirement_position)}
+        self.state = OccupancyState(generator, Genome(slots, teachers))
+        # suggest() tries swaps on the shared state and undoes them; readers wait meanwhile
+        self.lock = threading.RLock()
+
+        self.teacher_cells = defaultdict(list)
+        self.group_cells = defaultdict(list)
+        for i, (slot, teacher, group) in enumerate(zip(slots, teachers, generator.requirement_groups.tolist())):
+            self.teacher_cells[teacher, slot].append(i)
+            self.group_cells[group, slot].append(i)
+
+    def validate(self, position, slot):
+        """
+        Whether the lesson with frontend id `position` may move to `slot`.
+        Checks, in order: teacher clash, group clash, HARD constraints and the
+        teacher's HARD daily and consecutive period limits. Valid moves carry
+        `soft_delta`, the change in SOFT penalty.
+        """
+        i = self.position_requirement.get(position)
+        if i is None:
+            return {"valid": False, "reason": "Moved lesson not found."}
+        generator, state = self.generator, self.state
+        teacher, old_slot = state.teachers[i], state.slots[i]
+        teacher_name = generator.teachers[generator.teacher_ids[teacher]]['name']
+        if slot != old_slot:
+            busy = self.teacher_cells.get((teacher, slot))
+            if busy:
+                return {
+                    "valid": False,
+                    "reason": f"Teacher {teacher_name} is already busy.",
+                    "conflicting_lesson_id": self.requirement_position[busy[0]],
+                }
+            group = state.tables['groups'][i]
+            busy = self.group_cells.get((group, slot))
+            if busy:
+                group_name = generator.student_groups[generator.lesson_requirements[i]['group_id']]['group_name']
+                return {
+                    "valid": False,
+                    "reason": f"{group_name} already has a lesson then.",
+                    "conflicting_lesson_id": self.requirement_position[busy[0]],
+                }
+        hard = state.tables['hard']
+        if hard is not None:
+            if hard['teacher_slot'][teacher][slot] or hard['requirement_slot'][i][slot]:
+                return {"valid": False, "reason": "A HARD constraint rules out this slot."}
+            day, n_days = state.tables['slot_days'][slot], state.tables['n_days']
+            limit = hard['daily_limit'][teacher]
+            if (hard['daily_weight'][teacher] and day != state.tables['slot_days'][old_slot]
+                    and state.teacher_day[teacher * n_days + day] >= limit):
+                return {"valid": False, "reason": f"Teacher {teacher_name} would teach more than {limit} periods that day."}
+            if hard['consecutive'] and state.consecutive_delta(i, slot, teacher, hard) > 0:
+                limit = hard['consecutive_limit'][teacher]
+                return {"valid": False, "reason": f"Teacher {teacher_name} would teach more than {limit} periods in a row."}
+        return {"valid": True, "soft_delta": state.move_delta_components(i, slot)[1]}
+
+    def validate_many(self, position, slots):
+        """ validate() for several candidate drop targets of the same lesson. """
+        with self.lock:
+            return [self.validate(position, slot) for slot in slots]
+
+    def suggest(self, position):
+        """
+        Every slot the lesson can move to, as (slot, soft_delta) pairs sorted by
+        soft_delta, and, for slots where the move clashes with another lesson,
+        the swaps with that lesson that leave both clash-free, as
+        (slot, other_position, soft_delta). Returns None for an unknown lesson.
+        """
+        i = self.position_requirement.get(position)
+        if i is None:
+            return None
+        state = self.state
+        moves, swaps = [], []
+        teacher, group = state.teachers[i], state.tables['groups'][i]
+        with self.lock:
+            for slot in range(self.generator.n_slots):
+                if slot == state.slots[i]:
+                    continue
+                result = self.validate(position, slot)
+                if result['valid']:
+                    moves.append((slot, result['soft_delta']))
+                elif 'conflicting_lesson_id' in result:
+                    occupants = set(self.teacher_cells.get((teacher, slot), ())) | set(self.group_cells.get((group, slot), ()))
+                    for j in occupants:
+                        soft = self._swap_soft_delta(i, j)
+                        if soft is not None:
+                            swaps.append((slot, self.requirement_position[j], soft))
+        moves.sort(key=lambda move: move[1])
+        swaps.sort(key=lambda swap: swap[2])
+        return moves, swaps
+
+    def _swap_soft_delta(self, i, j):
+        """ SOFT penalty change of exchanging the slots of i and j, or None if either would be conflicted. """
+        state = self.state
+        slot_i, slot_j = state.slots[i], state.slots[j]
+        with self.lock:
+            soft = state.move_delta_components(i, slot_j)[1]
+            state.apply_move(i, slot_j)
+            soft += state.move_delta_components(j, slot_i)[1]
+            state.apply_move(j, slot_i)
+            feasible = not (state.is_conflicted(i) or state.is_conflicted(j))
+            state.apply_move(j, slot_j)
+            state.apply_move(i, slot_i)
+        return soft if feasible else None
+
+
+def get_validator(timetable_id):
+    """ The cached MoveValidator of a stored timetable, or None if the timetable does not exist. """
+    timetable_id = int(timetable_id)
+    key = (timetable_id, school_data_version())
+    validator = _validators.get(key)
+    if validator is not None:
+        _validators.move_to_end(key)
+        return validator
+    timetable = load_timetable(timetable_id)
+    if timetable is None:
+        return None
+    validator = _validators[key] = MoveValidator(timetable, load_school_data())
+    if len(_validators) > VALIDATOR_CACHE_SIZE:
+        _validators.popitem(last=False)
+    return validator
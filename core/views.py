@@ -3,32 +3,100 @@ from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework import viewsets
-from django.http import HttpResponse
+from rest_framework.decorators import action
+from rest_framework.settings import api_settings
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
 import openpyxl
 import json
 import io
 
 from .models import (
     Teacher, Subject, StudentGroup, TimeSlot, Lesson,
-    ConstraintType, ConstraintInstance, ConstraintParameter
+    ConstraintType, ConstraintInstance, ConstraintParameter, GenerationJob, AlgorithmSettings
 )
 from .serializers import (
     TeacherSerializer, SubjectSerializer, StudentGroupSerializer,
     TimeSlotSerializer, LessonSerializer, ConstraintTypeSerializer,
-    ConstraintInstanceSerializer, ConstraintParameterSerializer
+    ConstraintInstanceSerializer, ConstraintParameterSerializer, GenerationJobSerializer,
+    SearchBudgetSerializer, GASettingsSerializer, AlgorithmSettingsSerializer, job_context
 )
-from .generator import TimetableGenerator
+from .renderers import CompactJSONRenderer
+from .cache import clear_results, clearing_deferred
+from .jobs import enqueue_generation, stored_settings
+from .telemetry import PROFILERS, profiler_available
+from .timetables import load_timetable, latest_timetable_id, group_schedule
+from .validation import get_validator
+from .exports import stream_school_workbook
+from .imports import import_school, table_name
+
+def _parse_id(value):
+    """ A non-negative integer id sent as a number or a digit string, or None. """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if value >= 0 else None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
 
 # --- Data Management Views (RoomViewSet removed) ---
-class TeacherViewSet(viewsets.ModelViewSet):
+class BulkModelMixin:
+    """
+    Adds /bulk/ to a ModelViewSet: POST a list of objects to create them,
+    PATCH a list of objects with their "id" to update them, DELETE
+    {"ids": [...]} to delete. Each runs in one transaction with a handful of
+    queries; the serializer must use BulkListSerializer.
+    """
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ('bulk_create', 'bulk_update'):
+            context['preloaded'] = {}
+        return context
+
+    def bulk_response(self, objects, response_status=status.HTTP_200_OK):
+        # Bulk writes skip the model signals that normally clear cached generation results
+        clear_results()
+        queryset = self.get_queryset().filter(pk__in=[obj.pk for obj in objects]).order_by('pk')
+        return Response(self.get_serializer(queryset, many=True).data, status=response_status)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objects = serializer.save()
+        return self.bulk_response(objects, status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response({"error": "Expected a list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        ids = [item.get('id') for item in request.data if isinstance(item, dict) and str(item.get('id')).isdigit()]
+        instances = list(self.get_queryset().filter(pk__in=ids))
+        serializer = self.get_serializer(instances, data=request.data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objects = serializer.save()
+        return self.bulk_response(objects)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response({"error": 'Expected {"ids": [...]}.'}, status=status.HTTP_400_BAD_REQUEST)
+        model = self.get_queryset().model
+        with clearing_deferred(), transaction.atomic():
+            _, deleted = model.objects.filter(pk__in=ids).delete()
+        return Response({"deleted": deleted.get(model._meta.label, 0)})
+
+class TeacherViewSet(BulkModelMixin, viewsets.ModelViewSet):
     queryset = Teacher.objects.all()
     serializer_class = TeacherSerializer
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(BulkModelMixin, viewsets.ModelViewSet):
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
 
-class StudentGroupViewSet(viewsets.ModelViewSet):
+class StudentGroupViewSet(BulkModelMixin, viewsets.ModelViewSet):
     queryset = StudentGroup.objects.all()
     serializer_class = StudentGroupSerializer
 
@@ -37,8 +105,8 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
     queryset = TimeSlot.objects.all()
     serializer_class = TimeSlotSerializer
 
-class LessonViewSet(viewsets.ModelViewSet):
-    queryset = Lesson.objects.all()
+class LessonViewSet(BulkModelMixin, viewsets.ModelViewSet):
+    queryset = Lesson.objects.prefetch_related('teachers')
     serializer_class = LessonSerializer
 
 class ConstraintTypeViewSet(viewsets.ModelViewSet):
@@ -46,34 +114,131 @@ class ConstraintTypeViewSet(viewsets.ModelViewSet):
     serializer_class = ConstraintTypeSerializer
 
 class ConstraintInstanceViewSet(viewsets.ModelViewSet):
-    queryset = ConstraintInstance.objects.all()
+    queryset = ConstraintInstance.objects.select_related('constraint_type').prefetch_related('parameters')
     serializer_class = ConstraintInstanceSerializer
 
-class ConstraintParameterViewSet(viewsets.ModelViewSet):
+class ConstraintParameterViewSet(BulkModelMixin, viewsets.ModelViewSet):
     queryset = ConstraintParameter.objects.all()
     serializer_class = ConstraintParameterSerializer
 
+class ImportSchoolView(APIView):
+    def post(self, request, *args, **kwargs):
+        """
+        Multipart upload of an .xlsx workbook (one sheet per table) and/or CSV
+        files, each sent under its table name (teachers, subjects, student_groups,
+        lessons) or named after it. Returns what was created and rejected per table.
+        """
+        files = []
+        for field in request.FILES:
+            for upload in request.FILES.getlist(field):
+                csv_table = not upload.name.lower().endswith('.xlsx') and table_name(field)
+                files.append((f"{field}.csv" if csv_table else upload.name, upload))
+        if not files:
+            return Response({"error": "No files uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            summary = import_school(files)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary)
+
 # --- Core Functionality Views ---
 class GenerateTimetableView(APIView):
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer]
+
     def post(self, request, *args, **kwargs):
-        school_data = {
-            "teachers": list(Teacher.objects.values()),
-            "subjects": list(Subject.objects.values()),
-            # "rooms" removed
-            "student_groups": list(StudentGroup.objects.values()),
-            "timeslots": list(TimeSlot.objects.values()),
-            "lessons": list(Lesson.objects.values()),
-        }
-        generator = TimetableGenerator(school_data)
-        result = generator.run_generation()
-        return Response(result)
+        """
+        Queues a generation job; poll GET /api/generate/<id>/ for progress and the result.
+        When the same data and parameters were generated before, the cached result is
+        returned straight away (200 instead of 202).
+        An optional "budget" limits the search, e.g. {"profile": "interactive"} or
+        {"max_seconds": 30, "stagnation_generations": 100}. "warm_start": true (or a timetable id)
+        seeds the search from the last generated timetable after small data edits.
+        "settings" overrides the stored GA settings (see /api/settings/), e.g. {"profile": "auto"}
+        or {"population_size": 80, "mutation_rate": 0.2}.
+        "seed" (an integer) makes the run reproducible; every result reports the seed it used.
+        "profiler": true (cProfile) or "pyinstrument" profiles the run; such jobs bypass the cache
+        and the report is returned by GET /api/generate/<id>/telemetry/.
+        Only "schedules" is returned unless ?views= asks for others, e.g.
+        ?views=schedules,teacher_schedules,slot_matrix;
+        ?format=compact returns the dictionary-encoded timetable instead (see CompactJSONRenderer).
+        """
+        if not isinstance(request.data, dict):
+            return Response({"error": "Expected an object."}, status=status.HTTP_400_BAD_REQUEST)
+        parameters = {}
+        if request.data.get('budget') is not None:
+            budget = SearchBudgetSerializer(data=request.data['budget'])
+            if not budget.is_valid():
+                return Response({"budget": budget.errors}, status=status.HTTP_400_BAD_REQUEST)
+            parameters['budget'] = budget.validated_data
+        warm_start = request.data.get('warm_start')
+        if warm_start:
+            # true: the latest generated timetable; a number: that timetable
+            timetable_id = latest_timetable_id() if warm_start is True else warm_start
+            if not isinstance(timetable_id, int) or load_timetable(timetable_id) is None:
+                return Response({"warm_start": "No generated timetable to start from."}, status=status.HTTP_400_BAD_REQUEST)
+            parameters['warm_start_timetable'] = timetable_id
+        ga_settings = request.data.get('settings') or {}
+        if not isinstance(ga_settings, dict):
+            return Response({"settings": "Expected an object."}, status=status.HTTP_400_BAD_REQUEST)
+        ga_settings = GASettingsSerializer(data={**stored_settings(), **ga_settings})
+        if not ga_settings.is_valid():
+            return Response({"settings": ga_settings.errors}, status=status.HTTP_400_BAD_REQUEST)
+        if ga_settings.validated_data:
+            parameters['settings'] = ga_settings.validated_data
+        seed = request.data.get('seed')
+        if seed is not None:
+            if not isinstance(seed, int) or isinstance(seed, bool) or seed < 0:
+                return Response({"seed": "Must be a non-negative integer."}, status=status.HTTP_400_BAD_REQUEST)
+            parameters['seed'] = seed
+        profiler = request.data.get('profiler')
+        if profiler:
+            profiler = 'cprofile' if profiler is True else profiler
+            if not isinstance(profiler, str) or not profiler_available(profiler):
+                return Response(
+                    {"profiler": f"Choose one of {', '.join(PROFILERS)} (pyinstrument must be installed)."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            parameters['profiler'] = profiler
+        context = job_context(request)
+        job = enqueue_generation(parameters)
+        # A cached result completes the job immediately
+        response_status = status.HTTP_200_OK if job.from_cache else status.HTTP_202_ACCEPTED
+        return Response(GenerationJobSerializer(job, context=context).data, status=response_status)
+
+class GenerationJobView(APIView):
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer]
+
+    def get(self, request, pk, *args, **kwargs):
+        """ Progress and result of a generation job; ?views= as for POST /api/generate/. """
+        try:
+            job = GenerationJob.objects.get(pk=pk)
+        except GenerationJob.DoesNotExist:
+            return Response({"error": "Generation job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(GenerationJobSerializer(job, context=job_context(request)).data)
+
+class GenerationTelemetryView(APIView):
+    def get(self, request, pk, *args, **kwargs):
+        """ Per-generation metrics and phase timings of a finished job; null for cached or unfinished jobs. """
+        job = GenerationJob.objects.filter(pk=pk).values('id', 'status', 'from_cache', 'telemetry').first()
+        if job is None:
+            return Response({"error": "Generation job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
 
 class ExportTimetableView(APIView):
     def post(self, request, *args, **kwargs):
+        """ Body: {"timetable_id": ..., "student_group_id": ...}; returns that group's timetable as .xlsx. """
+        data = request.data if isinstance(request.data, dict) else {}
+        timetable_id = _parse_id(data.get('timetable_id'))
+        group_id = _parse_id(data.get('student_group_id'))
+        if timetable_id is None or group_id is None:
+            return HttpResponse("Invalid data", status=400)
+        timetable = load_timetable(timetable_id)
+        if not timetable:
+            return HttpResponse("Timetable not found", status=404)
+        schedule_data = group_schedule(timetable, group_id)
+        if schedule_data is None:
+            return HttpResponse("Student group not found", status=404)
         try:
-            schedule_data = json.loads(request.body).get('schedule')
-            if not schedule_data:
-                return HttpResponse("Invalid data", status=400)
 
             wb = openpyxl.Workbook()
             ws = wb.active
@@ -109,51 +274,98 @@ class ExportTimetableView(APIView):
         except Exception as e:
             return HttpResponse(f"An error occurred: {str(e)}", status=500)
     
+class ExportSchoolTimetableView(APIView):
+    def post(self, request, *args, **kwargs):
+        """ Body: {"timetable_id": ...}; streams one .xlsx with a sheet per student group and per teacher. """
+        timetable_id = _parse_id(request.data.get('timetable_id')) if isinstance(request.data, dict) else None
+        timetable = load_timetable(timetable_id) if timetable_id else None
+        if not timetable:
+            return HttpResponse("Invalid data", status=400)
+        response = StreamingHttpResponse(
+            stream_school_workbook(timetable),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+        response['Content-Disposition'] = f'attachment; filename="timetable_{timetable["id"]}.xlsx"'
+        return response
+
 class ValidateMoveView(APIView):
     def post(self, request, *args, **kwargs):
+        """
+        Body: {"timetable_id", "moved_lesson_id", "new_day", "new_timeslot"}, where
+        moved_lesson_id is a scheduled lesson's "id" and new_day / new_timeslot are
+        labels as in the schedules ("Monday", "Period 3"). Several drop targets can
+        be checked at once with "targets": [{"day": ..., "timeslot": ...}, ...];
+        the response is then {"results": [...]} in the same order.
+        """
         try:
             data = json.loads(request.body)
-            all_schedules = data.get('all_schedules')
-            moved_lesson_id = data.get('moved_lesson_id')
-            new_day = data.get('new_day')
-            new_timeslot = data.get('new_timeslot')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return Response({"error": "Invalid data provided"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            timetable_id = _parse_id(data.get('timetable_id'))
+            moved_lesson_id = _parse_id(data.get('moved_lesson_id'))
+            targets = data.get('targets')
+            if targets is None:
+                targets = [{"day": data.get('new_day'), "timeslot": data.get('new_timeslot')}]
 
-            if not all_schedules or not moved_lesson_id or not new_day or not new_timeslot:
+            if not timetable_id or moved_lesson_id is None or not isinstance(targets, list) or not targets:
                 return Response({"error": "Invalid data provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-            moved_lesson = None
-            for schedule in all_schedules:
-                for lesson in schedule.get('scheduled_lessons', []):
-                    if lesson.get('id') == moved_lesson_id:
-                        moved_lesson = lesson
-                        break
-                if moved_lesson:
-                    break
-            
-            if not moved_lesson:
-                 return Response({"valid": False, "reason": "Moved lesson not found."})
-
-            teacher_name = moved_lesson.get('teacher')
-            target_timeslot_full = f"{new_day}-{new_timeslot}"
-
-            for schedule in all_schedules:
-                for lesson in schedule.get('scheduled_lessons', []):
-                    if lesson.get('id') == moved_lesson_id:
-                        continue
-                    
-                    lesson_timeslot_full = f"{lesson.get('day')}-{lesson.get('timeslot')}"
-                    if lesson.get('teacher') == teacher_name and lesson_timeslot_full == target_timeslot_full:
-                        return Response({
-                            "valid": False,
-                            "reason": f"Teacher {teacher_name} is already busy.",
-                            "conflicting_lesson_id": lesson.get('id') # Return the conflicting lesson's ID
-                        })
-
-            return Response({"valid": True})
+            validator = get_validator(timetable_id)
+            if validator is None:
+                return Response({"error": "Timetable not found."}, status=status.HTTP_404_NOT_FOUND)
+            slots = []
+            for target in targets:
+                slot = validator.grid.slot_for_labels(target.get('day'), target.get('timeslot')) if isinstance(target, dict) else None
+                if slot is None:
+                    return Response({"error": "Invalid data provided"}, status=status.HTTP_400_BAD_REQUEST)
+                slots.append(slot)
+
+            results = validator.validate_many(moved_lesson_id, slots)
+            if 'targets' not in data:
+                return Response(results[0])
+            return Response({"results": [
+                {"day": target['day'], "timeslot": target['timeslot'], **result}
+                for target, result in zip(targets, results)
+            ]})
 
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class SuggestSlotsView(APIView):
+    def post(self, request, *args, **kwargs):
+        """
+        Body: {"timetable_id", "lesson_id"}. Returns every slot the lesson can move
+        to without a clash or HARD constraint violation, with the SOFT penalty
+        change of each ("moves", best first), and for clashing slots the swaps
+        with the lesson already there that keep both valid ("swaps").
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        timetable_id = _parse_id(data.get('timetable_id'))
+        lesson_id = _parse_id(data.get('lesson_id'))
+        if not timetable_id or lesson_id is None:
+            return Response({"error": "Invalid data provided"}, status=status.HTTP_400_BAD_REQUEST)
+        validator = get_validator(timetable_id)
+        if validator is None:
+            return Response({"error": "Timetable not found."}, status=status.HTTP_404_NOT_FOUND)
+        suggestions = validator.suggest(lesson_id)
+        if suggestions is None:
+            return Response({"error": "Lesson not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        def cell(slot):
+            day, timeslot = validator.grid.labels(slot)
+            return {"day": day, "timeslot": timeslot}
+
+        moves, swaps = suggestions
+        return Response({
+            "lesson_id": lesson_id,
+            "moves": [{**cell(slot), "soft_delta": soft} for slot, soft in moves],
+            "swaps": [{**cell(slot), "swap_with": other, "soft_delta": soft} for slot, other, soft in swaps],
+        })
+
+class AlgorithmSettingsViewSet(viewsets.ViewSet):
     """
     A custom ViewSet for handling AlgorithmSettings by their key.
     """
@@ -174,15 +386,20 @@ class ValidateMoveView(APIView):
 
     def update(self, request, pk=None):
         """
-        Handles PUT requests to /api/settings/<key>/.
+        Handles PUT requests to /api/settings/<key>/ with {"value": ...}.
         This will create the setting if it does not exist, or update it if it does.
         """
-        try:
-            setting, created = AlgorithmSettings.objects.update_or_create(
-                pk=pk,
-                defaults={'value': request.data.get('value')}
-            )
-            serializer = AlgorithmSettingsSerializer(setting)
-            return Response(serializer.data)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        setting = AlgorithmSettings.objects.filter(pk=pk).first()
+        serializer = AlgorithmSettingsSerializer(setting, data={'key': pk, 'value': request.data.get('value')})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(serializer.data)
+
+    def destroy(self, request, pk=None):
+        """ Handles DELETE requests to /api/settings/<key>/; the built-in default applies again. """
+        remaining = GASettingsSerializer(data=dict(AlgorithmSettings.objects.exclude(pk=pk).values_list('key', 'value')))
+        if not remaining.is_valid():
+            return Response(remaining.errors, status=status.HTTP_400_BAD_REQUEST)
+        deleted, _ = AlgorithmSettings.objects.filter(pk=pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT if deleted else status.HTTP_404_NOT_FOUND)
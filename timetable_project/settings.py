@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 import dj_database_url
 
@@ -52,6 +53,8 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Compresses API responses (generated schedules are large, repetitive JSON)
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -91,6 +94,26 @@ DATABASES = {
 }
 
 
+# Caches
+# The generation result cache is shared by the web and worker processes, so it
+# lives in the database (`python manage.py createcachetable`). Entries expire
+# after a week; hits extend that. When more than MAX_ENTRIES are stored, expired
+# entries are deleted first, then a third of the rest in cache key order, which
+# for fingerprint keys is arbitrary rather than least recently used.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'generation_results': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'generation_result_cache',
+        'TIMEOUT': 60 * 60 * 24 * 7,
+        'OPTIONS': {'MAX_ENTRIES': 200},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -136,4 +159,44 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
     'https://timetable-gen-kv.vercel.app', # Your live frontend URL
-]
\ No newline at end of file
+]
+
+# List endpoints return plain lists unless ?page_size= or ?cursor= is given
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.OptionalCursorPagination',
+}
+
+# Number of processes started by `manage.py run_generation_worker`
+GENERATION_WORKER_PROCESSES = int(os.environ.get('GENERATION_WORKER_PROCESSES', 1))
+
+# Processes used to score each GA generation (1 = evaluate in the worker itself)
+GENERATION_FITNESS_WORKERS = int(os.environ.get('GENERATION_FITNESS_WORKERS', 1))
+
+# Island-model GA: number of sub-populations evolved in parallel processes (1 = single population)
+GENERATION_ISLANDS = int(os.environ.get('GENERATION_ISLANDS', 1))
+
+# Seconds of simulated-annealing refinement on the elites after the GA (0 = off)
+GENERATION_REFINEMENT_SECONDS = float(os.environ.get('GENERATION_REFINEMENT_SECONDS', 0))
+
+# A RUNNING job whose worker has not sent a heartbeat for this many seconds is
+# considered dead: it is queued again, or failed after GENERATION_JOB_MAX_ATTEMPTS claims
+GENERATION_JOB_STALE_SECONDS = float(os.environ.get('GENERATION_JOB_STALE_SECONDS', 300))
+GENERATION_JOB_MAX_ATTEMPTS = int(os.environ.get('GENERATION_JOB_MAX_ATTEMPTS', 2))
+# Generator and worker logs go to the console; GENERATION_LOG_LEVEL=DEBUG adds one line per GA generation
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'generation': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'generation'},
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': os.environ.get('GENERATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}